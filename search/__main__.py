@@ -1,17 +1,131 @@
+import os
 import sys
-import json
+import argparse
 
-from search.util import print_move, print_boom, print_board, find_solution, move_function, print_sol
+#Each mode imports only what it uses, so start-up stays quick
+from search import stats
+from search.output import FORMATS, solution_writer
 
 
 def main():
-    with open(sys.argv[1]) as file:
-        data = json.load(file)
+    parser = argparse.ArgumentParser(prog="python -m search")
+    parser.add_argument("boards", nargs="+",
+        help="board JSON file, or with --batch: directories, globs, .jsonl files or - for stdin")
+    parser.add_argument("--batch", action="store_true",
+        help="solve every board given and write one JSON result per line")
+    parser.add_argument("--workers", type=int, default=None,
+        help="worker processes for --batch or --portfolio (default: one per CPU)")
+    parser.add_argument("--chunksize", type=int, default=1,
+        help="boards handed to a worker at a time")
+    parser.add_argument("--timeout", type=float, default=None,
+        help="seconds allowed per board before it is reported as a timeout")
+    parser.add_argument("--deadline", type=float, default=None,
+        help="anytime mode: milliseconds to spend improving the plan, keeping the best found")
+    parser.add_argument("--portfolio", action="store_true",
+        help="race several solver strategies on worker processes and keep the first verified "
+            "plan, or with --deadline the best one found in time")
+    parser.add_argument("--unordered", action="store_true",
+        help="write results as they finish instead of in input order")
+    parser.add_argument("--cache", default=None,
+        help="sqlite file of solved boards, reused across symmetric boards and runs")
+    parser.add_argument("--tablebase", default=None,
+        help="endgame tablebase file (from python -m search.tablebase) to look small boards up in")
+    parser.add_argument("--stats", action="store_true",
+        help="record node counts and phase timings (also set by SEARCH_STATS=1); "
+            "written to stderr, or into each record with --batch")
+    parser.add_argument("--profile", default=None,
+        help="run the solve under cProfile and save the profile to this file")
+    parser.add_argument("--verify", action="store_true",
+        help="replay the solution with the full game rules and report the result on stderr")
+    parser.add_argument("--tracemalloc", action="store_true",
+        help="trace memory during the solve and add the peak to the stats")
+    parser.add_argument("--format", choices=FORMATS, default="text",
+        help="text: MOVE/BOOM lines; jsonl: one JSON object with the moves and booms")
+    args = parser.parse_args()
+
+    #Flags a mode can't honour are refused rather than quietly dropped
+    if args.batch:
+        for flag, given in (("--portfolio", args.portfolio), ("--format", args.format != "text"),
+                ("--verify", args.verify), ("--profile", args.profile is not None),
+                ("--tracemalloc", args.tracemalloc)):
+            if given:
+                parser.error("{} can't be used with --batch".format(flag))
+    if args.cache is not None:
+        if args.deadline is not None:
+            parser.error("--cache can't be used with --deadline: anytime plans are not cached")
+        if args.portfolio:
+            parser.error("--cache can't be used with --portfolio: portfolio plans are not cached")
+
+    if args.tablebase is not None:
+        from search import tablebase
+        #Worker processes open it from the environment
+        os.environ["SEARCH_TABLEBASE"] = args.tablebase
+        try:
+            tablebase.use(args.tablebase)
+        except (OSError, ValueError) as error:
+            parser.error("--tablebase: {}".format(error))
+
+    if args.batch:
+        from search.batch import run_batch
+        run_batch(args.boards, workers=args.workers, chunksize=args.chunksize,
+            timeout=args.timeout, ordered=not args.unordered, cache=args.cache,
+            with_stats=args.stats or stats.ENABLED, deadline=args.deadline)
+        return
+
+    from search.load import invalid_board, load_board
+    from search.util import find_solution, move_function, print_sol, search_limit
+
+    with open(args.boards[0], "rb") as file:
+        try:
+            #One small board parses faster with json than it takes to import orjson
+            data = load_board(file.read(), fast=False)
+        except invalid_board as error:
+            sys.exit("{}: {}".format(args.boards[0], error))
+
+        if args.stats or args.tracemalloc:
+            stats.enable()
+        stats.begin()
+
+        #Keep stdout to the JSON records in jsonl format
+        notes = sys.stderr if args.format == "jsonl" else None
 
         # TODO: find and print winning action sequence
-        win_pos = find_solution(data)
-        paths,booms = move_function(data, win_pos)
-        print_sol(data, paths, booms)
+        try:
+            with stats.profiled(profile=args.profile, memory=args.tracemalloc):
+                if args.portfolio:
+                    from search.portfolio import solve_portfolio
+                    result = solve_portfolio(data, workers=args.workers, deadline_ms=args.deadline)
+                    paths,booms = result.paths, result.booms
+                    if not result.solved():
+                        print("Unable to find solution. Whoopsies.", file=notes)
+                elif args.deadline is not None:
+                    from search.anytime import solve_anytime
+                    result = solve_anytime(data, args.deadline)
+                    paths,booms = result.paths, result.booms
+                    if not result.solved():
+                        print("Unable to find solution. Whoopsies.", file=notes)
+                elif args.cache is None:
+                    covers = find_solution(data, every=True, file=notes)
+                    paths,booms = move_function(data, covers[0], covers=covers)
+                else:
+                    from search.cache import cached_solve, solution_cache
+                    cache = solution_cache(args.cache)
+                    paths,booms = cached_solve(data, cache, file=notes)
+                    cache.close()
+        except search_limit:
+            #The board may be solvable, the search just gave up at its node limit
+            print("Unable to find solution. Whoopsies.", file=notes)
+            sys.exit(1)
+        if args.format == "text":
+            print_sol(data, paths, booms)
+        else:
+            solution_writer(format=args.format).write(paths, booms, name=args.boards[0])
+        stats.dump(stats.end())
+
+        if args.verify:
+            import json
+            from search.game import plan_actions, verify
+            print(json.dumps(verify(data, plan_actions(paths, booms)).as_dict()), file=sys.stderr)
 
 
         #print()
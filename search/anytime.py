@@ -0,0 +1,87 @@
+"""
+This module solves a board against a wall-clock deadline. A fast weighted
+A* pass finds a first plan, and further passes with smaller weights look
+for shorter plans, each planning every minimum boom cover bounded by the
+best plan so far, until the deadline passes or a weight-1 pass over every
+cover proves the plan optimal. The result is always a complete, verified
+plan or an explicit "no solution found" status, never a partial one.
+"""
+
+import io
+import time
+
+from search.board import as_board
+from search.game import plan_actions, verify
+from search import stats
+from search.distance import distance_fields
+from search.util import cover_options, find_solution, plan_covers, plan_estimate, white_stacks
+
+#Weighted A* schedule: greedy and quick first, exact A* last
+WEIGHTS=[10, 3, 2, 1.25, 1]
+
+
+class solution:
+    """
+    The best plan found for a board. status is "solved" or "no solution
+    found"; paths and booms are in the format move_function returns. optimal
+    is True once an exact pass finished within the deadline.
+    """
+    def __init__(self, status="no solution found", paths=(), booms=(), passes=0, optimal=False):
+        self.status = status
+        self.paths = list(paths)
+        self.booms = list(booms)
+        self.passes = passes
+        self.optimal = optimal
+
+    def cost(self):
+        return len(self.paths) + len(self.booms)
+
+    def solved(self):
+        return self.status == "solved"
+
+    def as_dict(self):
+        return {"status": self.status, "actions": self.cost() if self.solved() else None,
+            "passes": self.passes, "optimal": self.optimal}
+
+
+def solve_anytime(data, deadline_ms, weights=None, **kwargs):
+    """
+    Return the best solution for data found within deadline_ms milliseconds.
+    Every pass plans each minimum boom cover, as move_function does, bounded
+    by the best plan so far.
+    """
+    deadline = time.perf_counter() + deadline_ms/1000
+    if weights is None:
+        weights = WEIGHTS
+    best = solution()
+
+    covers = find_solution(data, every=True, file=io.StringIO())
+    if -1 in covers[0]:
+        return best
+
+    board = as_board(data)
+    whites = white_stacks(board)
+    cap = sum(n for sq, n in whites)
+    options = cover_options(covers)
+    fields = {targets: distance_fields(board.black, targets, cap) for targets in options}
+    #The most promising covers first, so their plans bound the rest
+    options.sort(key=lambda targets: plan_estimate(whites, targets, fields[targets]))
+
+    for weight in weights:
+        if time.perf_counter() > deadline:
+            break
+
+        best.passes += 1
+        found, finished = plan_covers(board, whites, options, fields, weight=weight,
+            known=lambda: best.cost() if best.solved() else None, deadline=deadline,
+            accept=lambda moves, booms: verify(data, plan_actions(moves, booms)).ok(),
+            stats=stats.search("pathfinding"))
+        if found is not None:
+            best = solution("solved", found[0], found[1], best.passes)
+
+        #An exact pass that ran to the end for every cover can't be beaten
+        if weight == 1 and finished and best.solved():
+            best.optimal = True
+            break
+
+    return best
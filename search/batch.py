@@ -0,0 +1,187 @@
+"""
+This module solves many boards in one run, spreading them over a pool of
+worker processes so the interpreter start-up is paid once per worker rather
+than once per board. Boards can come from a directory of JSON files, a glob
+pattern, a JSON-lines file, or a JSON-lines stream on stdin ("-"), and one
+JSON result record is written per board.
+"""
+
+import glob
+import io
+import json
+import os
+import signal
+import sys
+import time
+from multiprocessing import Pool
+
+from search import stats
+from search.anytime import solve_anytime
+from search.game import plan_actions, verify
+from search.load import invalid_board, load_board, map_lines
+from search.output import serialise
+from search.util import find_solution, move_function, search_limit
+
+#Each worker process opens the solution cache once and keeps it
+_caches = {}
+
+
+class solve_timeout(Exception):
+    pass
+
+
+def read_boards(sources, **kwargs):
+    """
+    Yield a (name, text) pair for every board named by sources. Each source
+    is "-" for JSON lines on stdin, a directory (every *.json file in it), a
+    *.jsonl file (one board per line, read through a memory map) or a file
+    name / glob pattern. The text is left unparsed so the workers do the
+    parsing and checking in parallel. For a board in a file of its own text
+    is None and name is the path: the worker reads it, so a missing or
+    unreadable file is reported in its record instead of ending the batch.
+    """
+    for source in sources:
+        if source == "-":
+            yield from read_lines("-", sys.stdin)
+        elif os.path.isdir(source):
+            for path in sorted(glob.glob(os.path.join(source, "*.json"))):
+                yield path, None
+        else:
+            for path in sorted(glob.glob(source)) or [source]:
+                if path.endswith(".jsonl"):
+                    yield from map_lines(path)
+                else:
+                    yield path, None
+
+
+def read_lines(source, file, **kwargs):
+
+    for line_no, line in enumerate(file, 1):
+        if line.strip():
+            yield "{}:{}".format(source, line_no), line
+
+
+def read_file(path, **kwargs):
+
+    with open(path) as file:
+        return file.read()
+
+
+def open_cache(path, **kwargs):
+
+    #sqlite3 is only imported by batches that use a cache
+    from search.cache import solution_cache
+    if path not in _caches:
+        _caches[path] = solution_cache(path)
+    return _caches[path]
+
+
+def _alarm(signum, frame):
+    raise solve_timeout()
+
+
+def solve_board(job, **kwargs):
+    """
+    Solve one (name, text, options) job and return its result record, where
+    options holds the timeout, deadline, cache path and stats flag of the batch, and
+    text None means the board is read from the file name. Any failure, including a
+    bad board, a missing file, running past the timeout or the search giving up
+    at its node limit, is reported in the record instead of stopping the batch.
+    """
+    name, text, options = job
+    timeout = options.get("timeout")
+    cache_path = options.get("cache")
+    record = {"board": name}
+    out = io.StringIO()
+    start = time.perf_counter()
+
+    if options.get("stats"):
+        stats.enable()
+    stats.begin()
+
+    #SIGALRM interrupts a stuck solve inside this worker without killing it
+    timed = bool(timeout) and hasattr(signal, "setitimer")
+    try:
+        try:
+            if timed:
+                signal.signal(signal.SIGALRM, _alarm)
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            if text is None:
+                text = read_file(name)
+            data = load_board(text)
+            if options.get("deadline") is not None:
+                result = solve_anytime(data, options["deadline"])
+                paths, booms = result.paths, result.booms
+                record["anytime"] = result.as_dict()
+            elif cache_path is None:
+                covers = find_solution(data, every=True, file=out)
+                paths, booms = move_function(data, covers[0], covers=covers)
+            else:
+                from search.cache import cached_solve
+                paths, booms = cached_solve(data, open_cache(cache_path), file=out)
+            actions = serialise(paths, booms).splitlines()
+            if not booms:
+                record["status"] = "no solution"
+            else:
+                #Replay every plan so a wrong answer never goes out as solved
+                result = verify(data, plan_actions(paths, booms))
+                record["status"] = "solved" if result.ok() else "invalid"
+                record["actions"] = actions
+                if not result.ok():
+                    record["verdict"] = result.as_dict()
+        except solve_timeout:
+            record["status"] = "timeout"
+        except search_limit as error:
+            #Unlike "no solution", the board may be solvable with a bigger budget
+            record["status"] = "search limit"
+            record["error"] = str(error)
+        except invalid_board as error:
+            record["status"] = "bad board"
+            record["error"] = str(error)
+        except Exception as error:
+            record["status"] = "error"
+            record["error"] = "{}: {}".format(type(error).__name__, error)
+        finally:
+            if timed:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except solve_timeout:
+        #The alarm went off in a handler or before it was disarmed. It only
+        #fires once, so nothing can interrupt this one
+        record.setdefault("status", "timeout")
+
+    record["time"] = round(time.perf_counter() - start, 6)
+    board_stats = stats.end()
+    if board_stats is not None:
+        record["stats"] = board_stats.as_dict()
+    return record
+
+
+def run_batch(sources, workers=None, chunksize=1, timeout=None, ordered=True,
+        cache=None, with_stats=False, deadline=None, out=sys.stdout, **kwargs):
+    """
+    Solve every board named by sources on a pool of workers processes
+    (default: one per CPU) and write one JSON line per board to out, in input
+    order if ordered is True or as soon as each finishes otherwise. timeout
+    is the per-board limit in seconds, and cache the path of a solution cache
+    file shared by all workers. with_stats adds each board's solver stats to
+    its record, and deadline (milliseconds) solves each board in anytime
+    mode. Returns the number of boards solved.
+    """
+    if cache is not None and deadline is not None:
+        raise ValueError("a cache can't be used with a deadline: anytime plans are not cached")
+    options = {"timeout": timeout, "cache": cache, "stats": with_stats, "deadline": deadline}
+    jobs = ((name, text, options) for name, text in read_boards(sources))
+    solved = 0
+
+    with Pool(workers) as pool:
+        if ordered:
+            records = pool.imap(solve_board, jobs, chunksize)
+        else:
+            records = pool.imap_unordered(solve_board, jobs, chunksize)
+
+        for record in records:
+            solved += record["status"] == "solved"
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+
+    return solved
@@ -0,0 +1,273 @@
+"""
+This module benchmarks the solver on generated boards. Each board is run
+through the same phases as find_solution and move_function (island graph,
+win-position search, pathfinding), recording the wall time, nodes
+expanded and optionally the peak memory of every phase. The results are
+written as JSON so runs from different commits can be compared. With
+--startup it instead times how long python -m search spends importing the
+package for a one-shot solve, and fails when that goes over budget. With
+--reference it replays the reference boards instead (see search.reference)
+and fails on any regression.
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from search.board import bitboard
+from search.game import plan_actions, verify
+from search.generate import generate_many
+from search.util import finalise_win_pos, form_islands, move_function, search_limit
+
+PHASES=["islands", "win_pos", "pathfinding"]
+
+#Most milliseconds python -m search may spend on imports for a one-shot solve
+STARTUP_BUDGET_MS=40
+#Solved almost at once, so the start-up benchmark times little but the imports
+STARTUP_BOARD={"white": [[1, 3, 3]], "black": [[1, 3, 5]]}
+
+
+class phase_timer:
+    """
+    Context manager that records the wall time (and with memory=True the
+    peak traced memory) of one phase into record.
+    """
+    def __init__(self, record, name, memory):
+        self.record = record
+        self.name = name
+        self.memory = memory
+
+    def __enter__(self):
+        if self.memory:
+            tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record["time"][self.name] = time.perf_counter() - self.start
+        if self.memory:
+            self.record["memory"][self.name] = tracemalloc.get_traced_memory()[1] - self.base
+        return False
+
+
+def run_board(name, data, memory=False, **kwargs):
+    """
+    Solve one board phase by phase and return its benchmark record.
+    """
+    record = {"board": name, "time": {}, "memory": {}, "nodes": {}}
+
+    with phase_timer(record, "islands", memory):
+        board = bitboard(data)
+        graph = form_islands(board)
+
+    stats = {}
+    with phase_timer(record, "win_pos", memory):
+        covers = finalise_win_pos(data, board, graph, every=True, file=io.StringIO(), stats=stats)
+    record["nodes"]["win_pos"] = stats.get("expanded", 0)
+
+    stats = {}
+    with phase_timer(record, "pathfinding", memory):
+        try:
+            paths, booms = move_function(data, covers[0], stats=stats, covers=covers)
+        except search_limit:
+            paths, booms = [], []
+    record["nodes"]["pathfinding"] = stats.get("expanded", 0)
+
+    record["solved"] = bool(booms) and verify(data, plan_actions(paths, booms)).ok()
+    record["actions"] = len(paths) + len(booms)
+    record["time"]["total"] = sum(record["time"][phase] for phase in PHASES)
+    return record
+
+
+def percentile(values, p, **kwargs):
+
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values)-1, int(p/100*len(values)))]
+
+
+def summarise(records, **kwargs):
+    """
+    Return solve rate, time percentiles, nodes and peak memory per phase
+    over a list of board records.
+    """
+    summary = {
+        "boards": len(records),
+        "solve_rate": sum(record["solved"] for record in records) / max(1, len(records)),
+        "time": {},
+        "nodes": {},
+        "memory": {},
+    }
+    for phase in PHASES + ["total"]:
+        times = [record["time"][phase] for record in records]
+        summary["time"][phase] = {
+            "p50": percentile(times, 50),
+            "p90": percentile(times, 90),
+            "p99": percentile(times, 99),
+            "max": max(times) if times else None,
+        }
+    for phase in ["win_pos", "pathfinding"]:
+        nodes = [record["nodes"][phase] for record in records]
+        summary["nodes"][phase] = {"total": sum(nodes), "p50": percentile(nodes, 50),
+            "max": max(nodes) if nodes else None}
+    for phase in PHASES:
+        peaks = [record["memory"][phase] for record in records if phase in record["memory"]]
+        if peaks:
+            summary["memory"][phase] = {"peak": max(peaks)}
+    return summary
+
+
+def git_commit(**kwargs):
+
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_bench(count, seed=0, memory=False, **kwargs):
+    """
+    Benchmark count generated boards (see search.generate.generate for the
+    board options in kwargs) and return the full results dict.
+    """
+    if memory:
+        tracemalloc.start()
+    try:
+        records = [run_board(name, data, memory)
+            for name, data in generate_many(count, seed=seed, **kwargs)]
+    finally:
+        if memory:
+            tracemalloc.stop()
+
+    return {
+        "commit": git_commit(),
+        "config": dict(kwargs, count=count, seed=seed, memory=memory),
+        "summary": summarise(records),
+        "boards": records,
+    }
+
+
+def import_time(report, **kwargs):
+    """
+    Return the milliseconds spent importing the search package and all it
+    imports, from the python -X importtime report of python -m search: the
+    cumulative time of every top-level import from the package on.
+    """
+    total = 0
+    started = False
+    for line in report.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not line.startswith("import time:"):
+            continue
+        name = fields[2]
+        started = started or name.strip() == "search"
+        #Nested imports are indented further and already counted by their parent
+        if started and len(name) - len(name.lstrip()) == 1:
+            total += int(fields[1])
+    return total/1000
+
+
+def startup_time(runs=7, **kwargs):
+    """
+    Return the median import time in milliseconds over runs one-shot solves
+    of STARTUP_BOARD, each in a fresh interpreter.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as file:
+        json.dump(STARTUP_BOARD, file)
+    try:
+        times = []
+        for run in range(runs):
+            result = subprocess.run([sys.executable, "-X", "importtime", "-m", "search", file.name],
+                capture_output=True, text=True, check=True)
+            times.append(import_time(result.stderr))
+    finally:
+        os.remove(file.name)
+    return statistics.median(times)
+
+
+def compare(old, new, **kwargs):
+    """
+    Print how the summary of new differs from old, phase by phase.
+    """
+    print("solve rate: {:.3f} -> {:.3f}".format(old["summary"]["solve_rate"],
+        new["summary"]["solve_rate"]))
+    for phase in PHASES + ["total"]:
+        if phase not in old["summary"]["time"]:
+            continue
+        a = old["summary"]["time"][phase]["p50"]
+        b = new["summary"]["time"][phase]["p50"]
+        print("{:12} p50 {:.6f}s -> {:.6f}s ({:+.1f}%)".format(phase, a, b,
+            100*(b-a)/a if a else 0))
+    for phase in ["win_pos", "pathfinding"]:
+        print("{:12} nodes {} -> {}".format(phase, old["summary"]["nodes"][phase]["total"],
+            new["summary"]["nodes"][phase]["total"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m search.bench")
+    parser.add_argument("count", type=int, nargs="?", default=100, help="number of boards")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blacks", type=int, default=6)
+    parser.add_argument("--whites", type=int, default=2)
+    parser.add_argument("--islands", type=int, default=2)
+    parser.add_argument("--density", type=float, default=0.5)
+    parser.add_argument("--tokens", type=int, default=None)
+    parser.add_argument("--adversarial", action="store_true")
+    parser.add_argument("--memory", action="store_true",
+        help="also record peak memory per phase (slows the timings down)")
+    parser.add_argument("--out", default=None, help="write the results JSON here")
+    parser.add_argument("--compare", default=None,
+        help="earlier results JSON to compare this run against")
+    parser.add_argument("--startup", action="store_true",
+        help="time the imports of a one-shot python -m search instead, failing over --budget")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS,
+        help="start-up budget in milliseconds (default {})".format(STARTUP_BUDGET_MS))
+    parser.add_argument("--reference", action="store_true",
+        help="check the solver against the reference boards instead, failing on any regression")
+    args = parser.parse_args()
+
+    if args.reference:
+        from search.reference import check_reference, load_reference
+        problems = check_reference()
+        for name, problem in problems:
+            print("{}: {}".format(name, problem))
+        print("reference boards: {} checked, {} problems".format(len(load_reference()), len(problems)))
+        if problems:
+            sys.exit("the reference check failed")
+        return
+
+    if args.startup:
+        spent = startup_time()
+        print("start-up imports: {:.1f}ms (budget {:.0f}ms)".format(spent, args.budget))
+        if spent > args.budget:
+            sys.exit("start-up is over budget")
+        return
+
+    results = run_bench(args.count, seed=args.seed, memory=args.memory,
+        blacks=args.blacks, whites=args.whites, islands=args.islands,
+        density=args.density, tokens=args.tokens, adversarial=args.adversarial)
+
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(results, file, indent=1)
+    else:
+        json.dump(results["summary"], sys.stdout, indent=1)
+        print()
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+This module contains a compact bitboard representation of an Expendibots
+board. Every square (x, y) is numbered sq = x + 8*y, so any set of squares
+(black tokens, white tokens, a boom neighbourhood) fits in one 64-bit int.
+"""
+
+#Board dimensions
+SIZE=8
+SQUARES=SIZE*SIZE
+
+#Per-token list layout used by the JSON input, [n, x, y]
+n=0
+x=1
+y=2
+
+def square(x, y):
+    """
+    Return the square number of the coordinate (x, y).
+    """
+    return x + SIZE*y
+
+
+def coords(sq):
+    """
+    Return the (x, y) coordinate of square number sq.
+    """
+    return sq % SIZE, sq // SIZE
+
+
+def on_board(x, y):
+
+    return (x>=0 and x<SIZE and y>=0 and y<SIZE)
+
+
+def bits(mask):
+    """
+    Yield the square numbers set in mask, lowest square first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length()-1
+        mask ^= low
+
+
+def count(mask):
+
+    return bin(mask).count("1")
+
+
+def neighbourhood(sq):
+    """
+    Return the mask of the 3x3 square centred on sq (including sq itself),
+    clipped to the board. This is exactly the area a boom at sq clears.
+    """
+    cx, cy = coords(sq)
+    mask = 0
+    for i in range(cx-1, cx+2):
+        for j in range(cy-1, cy+2):
+            if(on_board(i, j)):
+                mask |= 1 << square(i, j)
+    return mask
+
+
+#3x3 blast mask of every square, so a boom never has to rebuild its window
+BLAST=[neighbourhood(sq) for sq in range(SQUARES)]
+
+
+def ray(sq, dx, dy):
+    """
+    Return the squares met walking from sq in direction (dx, dy), nearest
+    first, up to the edge of the board.
+    """
+    cx, cy = coords(sq)
+    squares = []
+    while on_board(cx+dx, cy+dy):
+        cx, cy = cx+dx, cy+dy
+        squares.append(square(cx, cy))
+    return squares
+
+
+#The four straight lines a stack on each square can move along
+RAYS=[[ray(sq, dx, dy) for dx, dy in ((0,1), (0,-1), (1,0), (-1,0))] for sq in range(SQUARES)]
+
+
+def symmetry(t, x, y):
+    """
+    Apply symmetry t (0-7) of the square to (x, y): bit 2 of t swaps x and
+    y, then bit 0 mirrors x and bit 1 mirrors y.
+    """
+    if t & 4:
+        x, y = y, x
+    if t & 1:
+        x = SIZE-1-x
+    if t & 2:
+        y = SIZE-1-y
+    return x, y
+
+
+def inverse(table):
+    """
+    Return the square mapping that undoes table.
+    """
+    back = [0]*len(table)
+    for sq in range(len(table)):
+        back[table[sq]] = sq
+    return back
+
+
+#Where each square goes under each of the 8 symmetries, and back again
+SYMMETRIES=[[square(*symmetry(t, *coords(sq))) for sq in range(SQUARES)] for t in range(8)]
+INVERSES=[inverse(SYMMETRIES[t]) for t in range(8)]
+
+
+def chain(occupied, sq):
+    """
+    Return the mask of tokens eliminated by a boom at sq, following the chain
+    reaction through every token of occupied caught in a blast. The booming
+    square itself is always included, whether or not it is in occupied.
+    """
+    cleared = 1 << sq
+    frontier = cleared
+    while frontier:
+        low = frontier & -frontier
+        frontier ^= low
+        hit = BLAST[low.bit_length()-1] & occupied & ~cleared
+        cleared |= hit
+        frontier |= hit
+    return cleared
+
+
+def components(mask):
+    """
+    Split mask into its chain-connected groups (touching tokens), returned in
+    order of their lowest square. Each group is cleared by a single boom on
+    any of its squares.
+    """
+    groups = []
+    while mask:
+        group = chain(mask, (mask & -mask).bit_length()-1)
+        groups.append(group)
+        mask &= ~group
+    return groups
+
+
+def shoreline(group, black):
+    """
+    Return the free squares from which a boom reaches group directly.
+    """
+    shore = 0
+    for sq in bits(group):
+        shore |= BLAST[sq]
+    return shore & ~black
+
+
+class bitboard:
+    """
+    Black and white occupancy masks plus the stack height on every square,
+    built once from a parsed board configuration (the dict loaded from the
+    input JSON file).
+    """
+    def __init__(self, data):
+        self.black=0
+        self.white=0
+        self.height=[0]*SQUARES
+
+        for token in data["black"]:
+            sq=square(token[x], token[y])
+            self.black |= 1 << sq
+            self.height[sq]+=token[n]
+
+        for token in data["white"]:
+            sq=square(token[x], token[y])
+            self.white |= 1 << sq
+            self.height[sq]+=token[n]
+
+    def copy(self):
+
+        board=bitboard.__new__(bitboard)
+        board.black=self.black
+        board.white=self.white
+        board.height=list(self.height)
+        return board
+
+    def occupied(self):
+
+        return self.black | self.white
+
+    def white_tokens(self):
+        """
+        Return the number of white tokens, over all stacks.
+        """
+        return sum(self.height[sq] for sq in bits(self.white))
+
+
+def as_board(data):
+    """
+    Return data as a bitboard: data itself if it already is one, otherwise
+    the bitboard built from the board dict.
+    """
+    if isinstance(data, bitboard):
+        return data
+    return bitboard(data)
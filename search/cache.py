@@ -0,0 +1,126 @@
+"""
+This module caches solved boards by their canonical form under the 8
+symmetries of the square, so a board that is a rotation or reflection of one
+already solved becomes a lookup. Plans are stored in the canonical frame and
+mapped back through the inverse symmetry on the way out. The cache can be
+kept in memory only, or persisted to a sqlite file shared between runs and
+between batch workers.
+"""
+
+import json
+import sqlite3
+
+from search.board import INVERSES, SYMMETRIES, as_board, bits, coords, square
+from search.util import find_solution, move_function
+
+
+def canonical(data, **kwargs):
+    """
+    Return (key, t) where key is the smallest encoding of the board over all
+    8 symmetries and t is the symmetry that produces it.
+    """
+    board = as_board(data)
+    best = None
+    for t in range(8):
+        moved = SYMMETRIES[t]
+        whites = sorted((moved[sq], board.height[sq]) for sq in bits(board.white))
+        blacks = sorted((moved[sq], board.height[sq]) for sq in bits(board.black))
+        key = "W{}B{}".format(
+            ",".join("{}:{}".format(*token) for token in whites),
+            ",".join("{}:{}".format(*token) for token in blacks))
+        if best is None or key < best[0]:
+            best = (key, t)
+    return best
+
+
+def map_plan(paths, booms, table, **kwargs):
+    """
+    Move every coordinate of a plan through the square mapping table (one of
+    SYMMETRIES or INVERSES).
+    """
+    def move(coord):
+        return coords(table[square(coord[0], coord[1])])
+
+    return ([(n, move(start), move(end)) for n, start, end in paths],
+        [move(boom) for boom in booms])
+
+
+class solution_cache:
+    """
+    Plans keyed by canonical board. With a path the plans are also kept in a
+    sqlite file, so other runs and processes can read them.
+    """
+    def __init__(self, path=None):
+        self.plans = {}
+        self.db = None
+        if path is not None:
+            #WAL lets batch workers read while another one writes
+            self.db = sqlite3.connect(path, timeout=30)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, plan TEXT)")
+            self.db.commit()
+
+    def lookup(self, key):
+
+        if key in self.plans:
+            return self.plans[key]
+        if self.db is None:
+            return None
+
+        row = self.db.execute("SELECT plan FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        paths, booms = json.loads(row[0])
+        plan = ([(n, tuple(start), tuple(end)) for n, start, end in paths],
+            [tuple(boom) for boom in booms])
+        self.plans[key] = plan
+        return plan
+
+    def store(self, key, paths, booms):
+
+        self.plans[key] = (paths, booms)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?)",
+                (key, json.dumps([paths, booms])))
+            self.db.commit()
+
+    def get(self, data):
+        """
+        Return the cached (paths, booms) for data in its own orientation, or
+        None if no symmetric board has been solved.
+        """
+        key, t = canonical(data)
+        plan = self.lookup(key)
+        if plan is None:
+            return None
+        return map_plan(plan[0], plan[1], INVERSES[t])
+
+    def put(self, data, paths, booms):
+
+        key, t = canonical(data)
+        paths, booms = map_plan(paths, booms, SYMMETRIES[t])
+        self.store(key, paths, booms)
+
+    def close(self):
+
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+def cached_solve(data, cache, **kwargs):
+    """
+    Return (paths, booms) for data from cache if a symmetric board has been
+    solved before, otherwise solve it and remember the plan. Boards with no
+    solution are not cached.
+    """
+    plan = cache.get(data)
+    if plan is not None:
+        return plan
+
+    covers = find_solution(data, every=True, **kwargs)
+    paths, booms = move_function(data, covers[0], covers=covers)
+    if booms:
+        cache.put(data, paths, booms)
+    return paths, booms
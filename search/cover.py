@@ -0,0 +1,129 @@
+"""
+This module finds the fewest booms that clear every island. Each candidate
+boom is a key: a mask with bit i set for every island it clears. Choosing
+keys that together set every bit is a set-cover problem, small enough (one
+bit per island) to solve exactly by branch and bound: keys contained in
+another key are dropped, the search always branches on the island with the
+fewest keys left to clear it, and any branch whose lower bound can't beat
+the cover size being tried is cut. It can return every minimum cover, so the
+pathfinding can choose whichever one is cheapest to reach.
+"""
+
+from search.board import bits, count
+from search.stats import tally
+
+#Most minimum covers handed on to pathfinding, which plans each of them
+COVER_LIMIT = 8
+
+
+def dominant(keys, **kwargs):
+    """
+    Return the keys that aren't a strict subset of another key, largest
+    first. A minimum cover never needs the others.
+    """
+    keys = sorted(set(keys), key=count, reverse=True)
+    return [key for key in keys if not any(key != other and key & other == key for other in keys)]
+
+
+def lower_bound(left, keys, isolated, **kwargs):
+    """
+    Return a lower bound on the keys needed to clear the islands in left:
+    one per isolated island, plus the rest shared out as evenly as the
+    largest key allows. It is infinite when some island can't be cleared.
+    """
+    rest = left & ~isolated
+    if not rest:
+        return count(left)
+    best = max(count(key & rest) for key in keys)
+    if not best:
+        return float("inf")
+    return count(left & isolated) + -(-count(rest) // best)
+
+
+def min_covers(keys, goal, limit, isolated=0, every=False, most=COVER_LIMIT, stats=None, **kwargs):
+    """
+    Return the minimum covers of goal as tuples of keys, or [] when clearing
+    goal takes more than limit keys. With every=False only one cover is
+    returned; with every=True up to most covers of the minimum size are.
+    """
+    keys = dominant(keys)
+    #by_island[i]: the keys that clear island i
+    by_island = {i: [key for key in keys if key >> i & 1] for i in bits(goal)}
+    covers = []
+    seen = set()
+    wanted = most if every else 1
+
+    def search(left, chosen, size):
+        if not left:
+            cover = tuple(sorted(chosen, reverse=True))
+            if cover not in seen:
+                seen.add(cover)
+                covers.append(cover)
+            return
+        tally(stats, "expanded", 1)
+
+        #Whichever key clears it, the most constrained island has to be cleared
+        island = min(bits(left), key=lambda i: len(by_island[i]))
+        for key in by_island[island]:
+            tally(stats, "generated", 1)
+            if len(chosen) + 1 + lower_bound(left & ~key, keys, isolated) > size:
+                tally(stats, "pruned", 1)
+                continue
+            search(left & ~key, chosen + [key], size)
+            if len(covers) >= wanted:
+                return
+
+    #Try each cover size from the lower bound up, so the first covers found are minimum
+    size = lower_bound(goal, keys, isolated)
+    while size <= limit and not covers:
+        search(goal, [], size)
+        size += 1
+    return covers
+
+
+def responsibilities(cover, **kwargs):
+    """
+    Yield every way of splitting the islands of a cover between its keys, as
+    a tuple of shares, one per key. An island only one key clears is that
+    key's; an island several keys clear goes to each of them in turn. Any
+    boom clearing at least its share does the job of a key, so a smaller
+    share can be met from more squares.
+    """
+    private = [0]*len(cover)
+    shared = []
+    islands = 0
+    for key in cover:
+        islands |= key
+    for island in bits(islands):
+        owners = [element for element in range(0, len(cover)) if cover[element] >> island & 1]
+        if len(owners) > 1:
+            shared.append((island, owners))
+        else:
+            private[owners[0]] |= 1 << island
+
+    def split(index, shares):
+        if index == len(shared):
+            yield tuple(shares)
+            return
+        island, owners = shared[index]
+        for owner in owners:
+            shares[owner] |= 1 << island
+            yield from split(index+1, shares)
+            shares[owner] &= ~(1 << island)
+
+    yield from split(0, private)
+
+
+def cover_targets(groups, cover, most=COVER_LIMIT, **kwargs):
+    """
+    Return up to most ways of placing the booms of cover, each a list with
+    the boom squares for every key: the squares in groups whose key clears
+    that key's share of the islands.
+    """
+    placements = []
+    for shares in responsibilities(cover):
+        placements.append([[sq for key, squares in groups.items() if key & share == share
+            for sq in squares] for share in shares])
+        if len(placements) >= most:
+            break
+    return placements
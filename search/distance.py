@@ -0,0 +1,169 @@
+"""
+This module computes true move distances on a board. A distance field gives,
+for every square, the fewest MOVEs a stack of a given height needs to reach a
+set of target squares under the real rules: straight lines of up to height
+squares, jumping over anything, but never landing on black. Each field is
+a breadth-first search over bitboards, one whole frontier of squares per
+step. It also has a min-cost matching for assigning tokens to targets.
+"""
+
+import functools
+
+from search.board import RAYS, SQUARES, bits
+
+#Moves never go further than the board is wide, so taller stacks reach the same squares
+MAX_REACH = 7
+INF = float("inf")
+
+
+def reach_mask(sq, h, **kwargs):
+
+    #Squares a stack of height h on sq can move to, ignoring what is on them
+    mask = 0
+    for line in RAYS[sq]:
+        for dest in line[:h]:
+            mask |= 1 << dest
+    return mask
+
+
+@functools.lru_cache(maxsize=None)
+def reach_table(h, **kwargs):
+    """
+    Return the reach_mask of every square for height h (at most MAX_REACH),
+    built the first time a distance field needs it.
+    """
+    return [reach_mask(sq, h) for sq in range(SQUARES)]
+
+
+class movement_table(dict):
+    """
+    The squares a stack can move to on a board with black tokens on black:
+    table[sq << 3 | h] is the tuple of them for a stack of height h on sq
+    (h at most MAX_REACH). Entries are built the first time they are used.
+    """
+    def __init__(self, black):
+        super().__init__()
+        self.black = black
+
+    def __missing__(self, key):
+        sq, h = key >> 3, key & 7
+        dests = tuple(dest for line in RAYS[sq] for dest in line[:h] if not self.black >> dest & 1)
+        self[key] = dests
+        return dests
+
+
+@functools.lru_cache(maxsize=64)
+def movements(black, **kwargs):
+    """
+    Return the movement_table for black, shared by every search on a board
+    with those black tokens.
+    """
+    return movement_table(black)
+
+
+def rings(field, **kwargs):
+    """
+    Return masks where masks[d] holds the squares at most d moves from the
+    target of field, up to the furthest square that can reach it.
+    """
+    furthest = max((steps for steps in field if steps != INF), default=-1)
+    masks = [0]*(int(furthest)+1)
+    for sq in range(0, SQUARES):
+        if field[sq] != INF:
+            for steps in range(int(field[sq]), len(masks)):
+                masks[steps] |= 1 << sq
+    return masks
+
+
+def field_bits(black, target, h, **kwargs):
+    """
+    Return the distance field of target for a stack of height h, as a list
+    of 64 move counts (INF where target can't be reached).
+    """
+    h = min(h, MAX_REACH)
+    reach = reach_table(h)
+    field = [INF]*SQUARES
+    #A move and its reverse are both legal when neither end is black
+    frontier = seen = target & ~black
+    steps = 0
+    while frontier:
+        for sq in bits(frontier):
+            field[sq] = steps
+        grown = 0
+        for sq in bits(frontier):
+            grown |= reach[sq]
+        frontier = grown & ~black & ~seen
+        seen |= frontier
+        steps += 1
+    return field
+
+
+def distance_fields(black, targets, cap, **kwargs):
+    """
+    Return fields where fields[t][h][sq] is the fewest moves for a stack of
+    height h on sq to reach targets[t], for h from 1 to cap (fields[t][0] is
+    unused).
+    """
+    heights = list(range(1, min(cap, MAX_REACH)+1))
+    batched = [[field_bits(black, target, h) for h in heights] for target in targets]
+
+    #Heights past MAX_REACH share the tallest field
+    return [[None] + per_target + [per_target[-1]]*(cap - len(heights))
+        for per_target in batched]
+
+
+def min_cost_matching(cost, **kwargs):
+    """
+    Return (total, assignment) for the cheapest way to give every row of the
+    cost matrix its own column (rows <= columns), assignment[row] being the
+    column. This is the Hungarian method with potentials, O(rows^2 columns).
+    """
+    rows = len(cost)
+    if not rows:
+        return 0, []
+    cols = len(cost[0])
+    u = [0]*(rows+1)
+    v = [0]*(cols+1)
+    match = [0]*(cols+1)
+    way = [0]*(cols+1)
+
+    for row in range(1, rows+1):
+        match[0] = row
+        col0 = 0
+        slack = [INF]*(cols+1)
+        used = [False]*(cols+1)
+        while True:
+            used[col0] = True
+            row0 = match[col0]
+            delta = INF
+            col1 = 0
+            for col in range(1, cols+1):
+                if not used[col]:
+                    reduced = cost[row0-1][col-1] - u[row0] - v[col]
+                    if reduced < slack[col]:
+                        slack[col] = reduced
+                        way[col] = col0
+                    if slack[col] < delta:
+                        delta = slack[col]
+                        col1 = col
+            if delta == INF:
+                return INF, None
+            for col in range(0, cols+1):
+                if used[col]:
+                    u[match[col]] += delta
+                    v[col] -= delta
+                else:
+                    slack[col] -= delta
+            col0 = col1
+            if match[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            match[col0] = match[col1]
+            col0 = col1
+
+    assignment = [0]*rows
+    for col in range(1, cols+1):
+        if match[col]:
+            assignment[match[col]-1] = col-1
+    return sum(cost[row][assignment[row]] for row in range(rows)), assignment
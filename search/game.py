@@ -0,0 +1,251 @@
+"""
+This module simulates single-player Expendibots on bitboards. A position is
+the black occupancy mask plus the white stacks as a sorted tuple of
+(square, height) pairs, so positions are immutable and hashable. It replays
+MOVE and BOOM actions with the full rules (chain explosions included),
+checks solutions, and generates the successors of a position for searches
+that need exact game rules.
+"""
+
+import re
+
+from search.board import RAYS, SQUARES, as_board, bits, chain, coords, on_board, square
+from search.distance import MAX_REACH, movements
+
+MOVE_LINE = re.compile(r"MOVE (\d+) from \((\d+), (\d+)\) to \((\d+), (\d+)\)\.$")
+BOOM_LINE = re.compile(r"BOOM at \((\d+), (\d+)\)\.$")
+
+
+class illegal_action(Exception):
+    pass
+
+
+#Shared (square, height) pairs for heights up to the 12 tokens of a full game,
+#so positions built by the searches reuse them instead of each holding copies
+STACKS = [[(sq, h) for h in range(0, 13)] for sq in range(0, SQUARES)]
+
+
+def stack(sq, h, **kwargs):
+
+    if h < len(STACKS[sq]):
+        return STACKS[sq][h]
+    return (sq, h)
+
+
+def move_successors(black, whites, table=None, last=None, **kwargs):
+    """
+    Yield ((n, start, end), whites) for every legal MOVE from the white
+    stacks: n tokens of a stack of height h may go 1 to h squares in a
+    straight line, onto any square that isn't black. Squares are numbers.
+    The stacks a move doesn't touch are shared with whites, not copied.
+    table is the movement table for black, looked up if not given.
+
+    last is the (n, start, end) move that led to whites, if any. Moves that
+    carry that whole stack on along the same line, to a square it could
+    have reached from start in one move, are skipped: the position they
+    lead to is one move cheaper by the direct route.
+    """
+    if table is None:
+        table = movements(black)
+    skip_from, skip = line_skip(whites, last)
+
+    for element in range(0, len(whites)):
+        sq, h = whites[element]
+        rest = whites[:element] + whites[element+1:]
+        heights = dict(rest)
+        whole_skip = skip if sq == skip_from else 0
+
+        for dest in table[sq << 3 | (h if h < MAX_REACH else MAX_REACH)]:
+            there = heights.get(dest, 0)
+            others = tuple(pair for pair in rest if pair[0] != dest) if there else rest
+            for n in range(1, h+1):
+                if n == h and whole_skip >> dest & 1:
+                    continue
+                stacks = others + (stack(dest, there+n),)
+                if n < h:
+                    stacks += (stack(sq, h-n),)
+                yield (n, sq, dest), tuple(sorted(stacks))
+
+
+def line_skip(whites, last, **kwargs):
+
+    #(square, mask): the stack last moved whole, and the squares it could have gone straight to
+    if last is None:
+        return None, 0
+    n, start, end = last
+    heights = dict(whites)
+    if heights.get(end) != n or start in heights:
+        return None, 0
+
+    skip = 1 << start
+    rays = RAYS[start]
+    for direction in range(0, 4):
+        if end in rays[direction][:n]:
+            #The ray it went along and the one opposite it, up to its height
+            for line in (rays[direction], rays[direction ^ 1]):
+                for sq in line[:n]:
+                    skip |= 1 << sq
+    return end, skip
+
+
+class game:
+    """
+    An immutable Expendibots position.
+    """
+    __slots__ = ("black", "whites")
+
+    def __init__(self, black, whites):
+        self.black = black
+        self.whites = whites
+
+    @classmethod
+    def from_data(cls, data):
+        board = as_board(data)
+        return cls(board.black, tuple((sq, board.height[sq]) for sq in bits(board.white)))
+
+    def white_mask(self):
+        mask = 0
+        for sq, n in self.whites:
+            mask |= 1 << sq
+        return mask
+
+    def won(self):
+        return self.black == 0
+
+    def move(self, n, start, end):
+        """
+        Return the position after moving n tokens from square start to square
+        end, or raise illegal_action saying why the move is not allowed.
+        """
+        stacks = dict(self.whites)
+        h = stacks.get(start, 0)
+        sx, sy = coords(start)
+        ex, ey = coords(end)
+        distance = abs(sx-ex) + abs(sy-ey)
+
+        if not h:
+            raise illegal_action("no white stack at {}".format((sx, sy)))
+        if n < 1 or n > h:
+            raise illegal_action("cannot move {} of a stack of {}".format(n, h))
+        if (sx != ex and sy != ey) or distance == 0:
+            raise illegal_action("{} to {} is not a straight line".format((sx, sy), (ex, ey)))
+        if distance > h:
+            raise illegal_action("a stack of {} cannot move {} squares".format(h, distance))
+        if self.black >> end & 1:
+            raise illegal_action("{} is occupied by black".format((ex, ey)))
+
+        if n < h:
+            stacks[start] = h-n
+        else:
+            del stacks[start]
+        stacks[end] = stacks.get(end, 0) + n
+        return game(self.black, tuple(sorted(stacks.items())))
+
+    def boom(self, sq):
+        """
+        Return the position after the white stack on square sq explodes,
+        chain reaction included, or raise illegal_action.
+        """
+        whites = self.white_mask()
+        if not whites >> sq & 1:
+            raise illegal_action("no white stack at {} to boom".format(coords(sq)))
+
+        cleared = chain(self.black | whites, sq)
+        return game(self.black & ~cleared,
+            tuple(stack for stack in self.whites if not cleared >> stack[0] & 1))
+
+    def apply(self, action):
+        """
+        Apply an action, ("MOVE", n, (x_a, y_a), (x_b, y_b)) or
+        ("BOOM", (x, y)), and return the new position.
+        """
+        for coord in action[2:] if action[0] == "MOVE" else action[1:]:
+            if not on_board(*coord):
+                raise illegal_action("{} is off the board".format(tuple(coord)))
+
+        if action[0] == "MOVE":
+            return self.move(action[1], square(*action[2]), square(*action[3]))
+        return self.boom(square(*action[1]))
+
+    def successors(self):
+        """
+        Yield (action, position) for every legal action from this position.
+        """
+        for sq, n in self.whites:
+            yield ("BOOM", coords(sq)), self.boom(sq)
+        for (n, start, end), whites in move_successors(self.black, self.whites):
+            yield ("MOVE", n, coords(start), coords(end)), game(self.black, whites)
+
+
+class verdict:
+    """
+    The outcome of replaying a solution: status is "win", "illegal" or
+    "incomplete" (black tokens left). For "illegal", index and reason say
+    which action failed and why.
+    """
+    def __init__(self, status, index=None, reason=None, position=None):
+        self.status = status
+        self.index = index
+        self.reason = reason
+        self.position = position
+
+    def ok(self):
+        return self.status == "win"
+
+    def as_dict(self):
+        record = {"status": self.status}
+        if self.index is not None:
+            record["index"] = self.index
+            record["reason"] = self.reason
+        if self.position is not None:
+            record["black_left"] = bin(self.position.black).count("1")
+        return record
+
+
+def verify(data, actions, **kwargs):
+    """
+    Replay actions from the board data and return a verdict. The game ends
+    as soon as the last black token is gone, so any action after that is
+    illegal too.
+    """
+    position = game.from_data(data)
+    for index, action in enumerate(actions):
+        if position.won():
+            return verdict("illegal", index, "the game was already won", position)
+        try:
+            position = position.apply(action)
+        except illegal_action as error:
+            return verdict("illegal", index, str(error), position)
+
+    return verdict("win" if position.won() else "incomplete", position=position)
+
+
+def plan_actions(paths, booms, **kwargs):
+    """
+    Turn the (paths, booms) returned by move_function into a list of actions.
+    """
+    return ([("MOVE", n, start, end) for n, start, end in paths]
+        + [("BOOM", boom) for boom in booms])
+
+
+def parse_actions(lines, **kwargs):
+    """
+    Parse printed MOVE/BOOM lines back into actions. A line in any other
+    format raises illegal_action.
+    """
+    actions = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        match = MOVE_LINE.match(line)
+        if match:
+            n, x_a, y_a, x_b, y_b = map(int, match.groups())
+            actions.append(("MOVE", n, (x_a, y_a), (x_b, y_b)))
+            continue
+        match = BOOM_LINE.match(line)
+        if match:
+            actions.append(("BOOM", tuple(map(int, match.groups()))))
+            continue
+        raise illegal_action("cannot parse {!r}".format(line))
+    return actions
@@ -0,0 +1,169 @@
+"""
+This module generates board configurations for testing and benchmarking.
+Every board is built from a seed, so the same arguments always give the same
+boards. Boards can be written to a directory of JSON files or to a JSON-lines
+file, ready for the batch solver or the benchmark.
+"""
+
+import argparse
+import json
+import os
+import random
+
+from search.board import BLAST, SIZE, bits, coords, square
+
+
+def generate(seed, blacks=6, whites=2, islands=2, density=0.5, tokens=None,
+        adversarial=False, **kwargs):
+    """
+    Return a board dict with black tokens in islands separate islands and
+    whites white stacks.
+
+    Arguments:
+    seed -- Seed for the random number generator.
+    blacks -- Number of black tokens (at least islands).
+    whites -- Number of white stacks.
+    islands -- Number of separate (non-touching) black islands wanted. If the
+        islands can't be placed apart after a few attempts, fewer are used.
+    density -- 0 spreads the islands over the whole board, 1 packs them into
+        a 4x4 corner of it.
+    tokens -- Total white tokens shared between the stacks. Default is
+        enough for one boom per island.
+    adversarial -- True to make the board awkward: islands a single square
+        apart (so bridges and chains matter) and all white stacks in the
+        corner furthest from them.
+    """
+    rng = random.Random(seed)
+    islands = max(1, min(islands, blacks))
+    if tokens is None:
+        tokens = max(whites, islands)
+
+    side = SIZE - round(4*density)
+    region = [square(x, y) for x in range(side) for y in range(side)]
+
+    for attempt in range(20):
+        black, groups = place_islands(rng, blacks, islands, region, adversarial)
+        if len(groups) == islands:
+            break
+
+    white = place_whites(rng, black, whites, tokens, adversarial)
+
+    return {
+        "white": [[n, *coords(sq)] for sq, n in white],
+        "black": [[1, *coords(sq)] for sq in bits(black)],
+    }
+
+
+def place_islands(rng, blacks, islands, region, adversarial, **kwargs):
+
+    black = 0
+    groups = []
+
+    #Seed each island on a square that doesn't touch any earlier island
+    for i in range(islands):
+        taken = 0
+        for group in groups:
+            for sq in bits(group):
+                taken |= BLAST[sq]
+        if adversarial and groups:
+            #One square gap: touching the ring around an island, not the island
+            ring = 0
+            for sq in bits(taken):
+                ring |= BLAST[sq]
+            options = [sq for sq in region if ring >> sq & 1 and not taken >> sq & 1]
+        else:
+            options = [sq for sq in region if not taken >> sq & 1]
+        if not options:
+            break
+        sq = rng.choice(options)
+        groups.append(1 << sq)
+        black |= 1 << sq
+
+    #Grow the islands one token at a time without letting two of them touch
+    for i in range(blacks - len(groups)):
+        order = list(range(len(groups)))
+        rng.shuffle(order)
+        for element in order:
+            others = 0
+            for other in range(len(groups)):
+                if other != element:
+                    for sq in bits(groups[other]):
+                        others |= BLAST[sq]
+            grow = 0
+            for sq in bits(groups[element]):
+                grow |= BLAST[sq]
+            options = list(bits(grow & ~black & ~others))
+            if options:
+                sq = rng.choice(options)
+                groups[element] |= 1 << sq
+                black |= 1 << sq
+                break
+
+    return black, groups
+
+
+def place_whites(rng, black, whites, tokens, adversarial, **kwargs):
+
+    whites = max(1, min(whites, tokens))
+    free = [sq for sq in range(SIZE*SIZE) if not black >> sq & 1]
+
+    if adversarial:
+        #The free squares furthest (in moves) from the black centre of mass
+        squares = list(bits(black))
+        cx = sum(coords(sq)[0] for sq in squares) / len(squares)
+        cy = sum(coords(sq)[1] for sq in squares) / len(squares)
+        free.sort(key=lambda sq: -(abs(coords(sq)[0]-cx) + abs(coords(sq)[1]-cy)))
+        chosen = free[:whites]
+    else:
+        chosen = rng.sample(free, whites)
+
+    #Share the tokens out, at least one per stack
+    heights = [1]*whites
+    for i in range(tokens - whites):
+        heights[rng.randrange(whites)] += 1
+
+    return sorted(zip(chosen, heights))
+
+
+def generate_many(count, seed=0, **kwargs):
+    """
+    Yield (name, board) pairs for count boards, the i-th built from seed+i.
+    """
+    for i in range(count):
+        yield "board-{}".format(seed+i), generate(seed+i, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m search.generate")
+    parser.add_argument("count", type=int, help="number of boards")
+    parser.add_argument("--out", default="-",
+        help="directory for one JSON file per board, or a .jsonl file, or - for stdout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blacks", type=int, default=6)
+    parser.add_argument("--whites", type=int, default=2)
+    parser.add_argument("--islands", type=int, default=2)
+    parser.add_argument("--density", type=float, default=0.5)
+    parser.add_argument("--tokens", type=int, default=None)
+    parser.add_argument("--adversarial", action="store_true")
+    args = parser.parse_args()
+
+    boards = generate_many(args.count, seed=args.seed, blacks=args.blacks,
+        whites=args.whites, islands=args.islands, density=args.density,
+        tokens=args.tokens, adversarial=args.adversarial)
+
+    if args.out == "-":
+        for name, board in boards:
+            print(json.dumps(board))
+    elif args.out.endswith(".jsonl"):
+        with open(args.out, "w") as file:
+            for name, board in boards:
+                file.write(json.dumps(board) + "\n")
+    else:
+        os.makedirs(args.out, exist_ok=True)
+        for name, board in boards:
+            with open(os.path.join(args.out, name + ".json"), "w") as file:
+                json.dump(board, file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+This module re-solves boards that change a little at a time. An
+incremental_solver holds one board and everything derived from it, accepts
+changes of a token or a stack, and on the next solve rebuilds only what the
+changes made stale, so a repaired plan costs a fraction of a cold solve.
+"""
+
+from search.board import as_board, on_board, square
+from search.game import game
+from search.util import finalise_win_pos, move_function, transposition_table, white_stacks
+from search.islands import island_graph
+
+COLOURS = ("white", "black")
+
+
+class incremental_solver:
+    """
+    A board that can be changed and solved again. It keeps:
+    the island graph, which a change of black tokens only updates around the
+    changed squares; the minimum boom covers, distance fields and planned
+    routes, kept while the black tokens and the number of white tokens stay
+    the same; and the last plan, whose remainder is returned straight away
+    when the white stacks have just followed part of it.
+    """
+    def __init__(self, data):
+        self.board = as_board(data).copy()
+        self.graph = None
+        self.covers = None
+        #The (black, white tokens) that covers, fields and table belong to
+        self.context = None
+        self.fields = {}
+        self.table = transposition_table()
+        self.plan = None
+        self.trail = {}
+
+    def add_token(self, colour, x, y, n=1):
+        """
+        Put n more tokens of colour on (x, y).
+        """
+        sq = self.check(colour, x, y, n)
+        other = self.board.black if colour == "white" else self.board.white
+        if other >> sq & 1:
+            raise ValueError("{} is occupied by the other colour".format((x, y)))
+
+        board = self.board.copy()
+        if colour == "white":
+            board.white |= 1 << sq
+        else:
+            board.black |= 1 << sq
+        board.height[sq] += n
+        self.board = board
+
+    def remove_token(self, colour, x, y, n=1):
+        """
+        Take n tokens of colour off (x, y).
+        """
+        sq = self.check(colour, x, y, n)
+        mask = self.board.white if colour == "white" else self.board.black
+        if not mask >> sq & 1 or self.board.height[sq] < n:
+            raise ValueError("there aren't {} {} tokens on {}".format(n, colour, (x, y)))
+
+        board = self.board.copy()
+        board.height[sq] -= n
+        if not board.height[sq]:
+            if colour == "white":
+                board.white &= ~(1 << sq)
+            else:
+                board.black &= ~(1 << sq)
+        self.board = board
+
+    def move_stack(self, n, start, end):
+        """
+        Move n white tokens from square start to square end, both (x, y).
+        Any free or white square will do, not only a legal MOVE.
+        """
+        self.remove_token("white", start[0], start[1], n)
+        self.add_token("white", end[0], end[1], n)
+
+    def check(self, colour, x, y, n):
+
+        if colour not in COLOURS:
+            raise ValueError("colour must be one of {}, not {!r}".format(COLOURS, colour))
+        if not on_board(x, y):
+            raise ValueError("{} is off the board".format((x, y)))
+        if n < 1:
+            raise ValueError("n must be at least 1, not {}".format(n))
+        return square(x, y)
+
+    def solve(self, **kwargs):
+        """
+        Return (paths, booms) for the current board, in the format
+        move_function returns.
+        """
+        board = self.board
+        context = (board.black, board.white_tokens())
+
+        if context != self.context:
+            if self.graph is None:
+                self.graph = island_graph(board.black)
+            elif self.graph.black != board.black:
+                self.graph = self.graph.update(board.black)
+            self.covers = finalise_win_pos(board, board, self.graph, every=True, **kwargs)
+            self.fields = {}
+            self.table = transposition_table()
+            self.plan = None
+            self.trail = {}
+            self.context = context
+
+        #Stacks that moved along the last plan only need the rest of it
+        whites = white_stacks(board)
+        if whites in self.trail:
+            paths, booms = self.plan
+            return paths[self.trail[whites]:], booms
+
+        paths, booms = move_function(board, self.covers[0], table=self.table,
+            covers=self.covers, fields=self.fields)
+        self.plan = (paths, booms)
+
+        #Remember every position the plan passes through
+        position = game(board.black, whites)
+        self.trail = {whites: 0}
+        for index, (n, start, end) in enumerate(paths):
+            position = position.move(n, square(*start), square(*end))
+            self.trail.setdefault(position.whites, index+1)
+        return paths, booms
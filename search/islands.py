@@ -0,0 +1,85 @@
+"""
+This module builds the island graph of a board. Its nodes are the black
+islands (groups of black tokens one boom clears together) and its edges are
+the free squares whose boom reaches more than one island. Every boom square
+is filed under the set of islands it clears, so the win-position search only
+has to choose among a handful of such sets: a small set-cover problem.
+"""
+
+from search.board import BLAST, bits, components, coords, count, shoreline
+
+
+class island_graph:
+    """
+    The islands of a board and the squares that boom them.
+
+    islands[i] is the mask of island i. groups maps a set of islands (a mask
+    with bit i for island i) to the free squares whose boom clears exactly
+    those islands. Groups with two or more islands are the bridges, and
+    isolated is the set of islands no bridge reaches. islands can be given
+    when the components of black are already known.
+    """
+    def __init__(self, black, islands=None):
+        self.black = black
+        self.islands = components(black) if islands is None else islands
+        self.groups = {}
+
+        label = {}
+        for element in range(0, len(self.islands)):
+            for sq in bits(self.islands[element]):
+                label[sq] = element
+
+        #A boom clears every island its 3x3 touches and nothing else, since
+        #islands are exactly the groups a chain can spread through
+        for sq in bits(shoreline(black, black)):
+            key = 0
+            for hit in bits(BLAST[sq] & black):
+                key |= 1 << label[hit]
+            self.groups.setdefault(key, []).append(sq)
+
+        bridged = 0
+        for key in self.bridges():
+            bridged |= key
+        self.isolated = self.goal() & ~bridged
+
+    def update(self, black):
+        """
+        Return the graph for black tokens black, reusing every island the
+        change can't have touched: one with no changed square in or next to
+        it. Only the squares around the changes are regrouped into islands.
+        """
+        changed = self.black ^ black
+        near = 0
+        for sq in bits(changed):
+            near |= BLAST[sq]
+        kept = [island for island in self.islands if not island & near]
+        untouched = 0
+        for island in kept:
+            untouched |= island
+        return island_graph(black, kept + components(black & ~untouched))
+
+    def goal(self):
+        return (1 << len(self.islands)) - 1
+
+    def bridges(self):
+        """
+        Return the groups whose boom clears two or more islands.
+        """
+        return {key: squares for key, squares in self.groups.items() if count(key) > 1}
+
+    def neighbours(self, element):
+        """
+        Return the set of islands sharing a bridge with island element.
+        """
+        joined = 0
+        for key in self.bridges():
+            if key >> element & 1:
+                joined |= key
+        return joined & ~(1 << element)
+
+    def shore(self, element):
+        """
+        Return the squares whose boom clears island element, as [x, y] lists.
+        """
+        return [list(coords(sq)) for key, squares in self.groups.items()
+            if key >> element & 1 for sq in squares]
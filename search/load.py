@@ -0,0 +1,130 @@
+"""
+This module loads board configurations. Boards are parsed with orjson when
+it is installed (the standard json module otherwise, or when a single small
+board is read and importing orjson would cost more than it saves), checked
+once, and turned straight into a bitboard, which every stage of the solver
+accepts in place of the raw dict. The parsed input is only read, never changed. Large
+JSON-lines files are read through a memory map, one board at a time.
+"""
+
+import json
+import mmap
+
+from search.board import SIZE, bitboard, on_board, square
+
+#orjson once fast_json() has looked for it (None if it isn't installed)
+orjson = None
+_looked = False
+
+
+class invalid_board(ValueError):
+    pass
+
+
+def fast_json(**kwargs):
+
+    #Imported on first use, so modes that never parse a board don't pay for it
+    global orjson, _looked
+    if not _looked:
+        _looked = True
+        try:
+            import orjson as module
+        except ImportError:
+            module = None
+        orjson = module
+    return orjson
+
+
+def parse(text, fast=True, **kwargs):
+    """
+    Parse JSON text (str or bytes) with the fastest parser available, or
+    with the json module if fast is False.
+    """
+    if fast and fast_json() is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError as error:
+            raise invalid_board("not valid JSON: {}".format(error))
+    try:
+        return json.loads(text)
+    except ValueError as error:
+        raise invalid_board("not valid JSON: {}".format(error))
+
+
+def validate(data, **kwargs):
+    """
+    Raise invalid_board unless data is a board dict: "white" and "black"
+    lists of [n, x, y] tokens with n >= 1, every square on the board and no
+    square listed twice.
+    """
+    if not isinstance(data, dict):
+        raise invalid_board("a board must be a JSON object, not {}".format(type(data).__name__))
+
+    seen = {}
+    for colour in ("white", "black"):
+        tokens = data.get(colour)
+        if not isinstance(tokens, list):
+            raise invalid_board("{!r} must be a list of [n, x, y] tokens".format(colour))
+
+        for index, token in enumerate(tokens):
+            where = "{} token {}".format(colour, index)
+            if not isinstance(token, list) or len(token) != 3 or \
+                    not all(type(value) is int for value in token):
+                raise invalid_board("{}: {!r} is not [n, x, y] integers".format(where, token))
+            n, x, y = token
+            if n < 1:
+                raise invalid_board("{}: a stack needs at least one token, not {}".format(where, n))
+            if not on_board(x, y):
+                raise invalid_board("{}: {} is off the {}x{} board".format(where, (x, y), SIZE, SIZE))
+            if square(x, y) in seen:
+                raise invalid_board("{}: {} is already taken by {}".format(where, (x, y),
+                    seen[square(x, y)]))
+            seen[square(x, y)] = where
+
+
+def load_board(data, fast=True, **kwargs):
+    """
+    Return the bitboard for a board given as JSON text (str or bytes), a
+    parsed dict or a bitboard, raising invalid_board if it isn't valid.
+    fast is passed on to parse.
+    """
+    if isinstance(data, bitboard):
+        return data
+    if isinstance(data, (str, bytes, bytearray, memoryview)):
+        data = parse(data, fast)
+    validate(data)
+    return bitboard(data)
+
+
+def read_board(path, **kwargs):
+    """
+    Load the board in the JSON file at path.
+    """
+    with open(path, "rb") as file:
+        return load_board(file.read())
+
+
+def map_lines(path, **kwargs):
+    """
+    Yield ("path:line", text) for every non-blank line of a JSON-lines file,
+    reading it through a memory map so only the current line is copied out.
+    """
+    with open(path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            #An empty file can't be mapped, and has no boards anyway
+            return
+        with mapped:
+            start = 0
+            line_no = 0
+            size = len(mapped)
+            while start < size:
+                end = mapped.find(b"\n", start)
+                if end == -1:
+                    end = size
+                line_no += 1
+                line = mapped[start:end]
+                if line.strip():
+                    yield "{}:{}".format(path, line_no), line
+                start = end + 1
@@ -0,0 +1,58 @@
+"""
+This module writes solutions. A whole solution is turned into one string
+and written to its sink with a single write and a single flush, rather than
+one print call per action. Two formats are supported: "text", the MOVE/BOOM
+lines print_move and print_boom produce (byte for byte), and "jsonl", one
+compact JSON object per board.
+"""
+
+import json
+import sys
+
+FORMATS = ("text", "jsonl")
+
+MOVE_TEXT = "MOVE %d from (%d, %d) to (%d, %d).\n"
+BOOM_TEXT = "BOOM at (%d, %d).\n"
+
+
+def text_lines(paths, booms, **kwargs):
+    """
+    Return the solution as a list of MOVE/BOOM lines, each ending in a
+    newline, moves first, exactly as print_sol prints them.
+    """
+    lines = [MOVE_TEXT % (n, start[0], start[1], end[0], end[1]) for n, start, end in paths]
+    lines.extend([BOOM_TEXT % (boom[0], boom[1]) for boom in booms])
+    return lines
+
+
+def serialise(paths, booms, format="text", name=None, **kwargs):
+    """
+    Return the whole solution as one string in format. The jsonl record is
+    {"board": name, "moves": [[n, x_a, y_a, x_b, y_b], ...], "booms": [[x, y], ...]},
+    without "board" when name is None.
+    """
+    if format == "text":
+        return "".join(text_lines(paths, booms))
+    if format == "jsonl":
+        record = {} if name is None else {"board": name}
+        record["moves"] = [[n, start[0], start[1], end[0], end[1]] for n, start, end in paths]
+        record["booms"] = [[boom[0], boom[1]] for boom in booms]
+        return json.dumps(record, separators=(",", ":")) + "\n"
+    raise ValueError("unknown output format {!r}, expected one of {}".format(format, FORMATS))
+
+
+class solution_writer:
+    """
+    Writes one solution per board to file (default sys.stdout), in format,
+    with one write and one flush per board.
+    """
+    def __init__(self, file=None, format="text"):
+        if format not in FORMATS:
+            raise ValueError("unknown output format {!r}, expected one of {}".format(format, FORMATS))
+        self.file = file
+        self.format = format
+
+    def write(self, paths, booms, name=None):
+        file = sys.stdout if self.file is None else self.file
+        file.write(serialise(paths, booms, self.format, name))
+        file.flush()
@@ -0,0 +1,192 @@
+"""
+This module solves one hard board with a portfolio: several solver
+strategies run at once on separate processes, each planning the minimum
+boom covers in its own order, with its own weighted-A* weight and its own
+tie-breaking among equally promising states. The first plan that verifies
+is returned and the other workers are cancelled. Given a deadline, the
+portfolio instead keeps the best plan found until then, and the workers
+share a bound so each one prunes against the best plan any of them has.
+"""
+
+import io
+import multiprocessing
+import os
+import random
+import time
+
+from search.anytime import solution
+from search.board import as_board
+from search.distance import distance_fields
+from search.game import plan_actions, verify
+from search.util import cover_options, find_solution, plan_covers, plan_estimate, white_stacks
+
+#No plan found yet, by any worker
+NO_BOUND = 1 << 30
+
+#The bound shared by the workers of the running portfolio, set up in each worker
+_shared = None
+
+
+class strategy:
+    """
+    One way of searching a board. weight is the weighted-A* weight (1 is
+    exact). order is how the cover options are tried: "estimate" (cheapest
+    estimate first, as move_function does), "given" (as find_solution lists
+    them) or "shuffle". tiebreak orders states of equal priority: "fifo",
+    "lifo" or "random". seed seeds the shuffle and the random tie-breaks.
+    """
+    def __init__(self, weight=1, order="estimate", tiebreak="fifo", seed=0):
+        self.weight = weight
+        self.order = order
+        self.tiebreak = tiebreak
+        self.seed = seed
+
+    def __repr__(self):
+        return "strategy(weight={}, order={!r}, tiebreak={!r}, seed={})".format(
+            self.weight, self.order, self.tiebreak, self.seed)
+
+
+#The default portfolio: the plain solver first, then ever greedier and more varied strategies
+STRATEGIES = [
+    strategy(1),
+    strategy(1, tiebreak="lifo"),
+    strategy(3),
+    strategy(10, order="given"),
+    strategy(2, order="shuffle", tiebreak="random", seed=1),
+    strategy(1.25, tiebreak="lifo"),
+    strategy(10, order="shuffle", tiebreak="random", seed=2),
+    strategy(5, order="shuffle", tiebreak="lifo", seed=3),
+]
+
+
+def _share(bound):
+
+    global _shared
+    _shared = bound
+
+
+def shared_bound(**kwargs):
+
+    #The fewest actions any worker's plan takes so far (NO_BOUND if none)
+    return NO_BOUND if _shared is None else _shared.value
+
+
+def publish(cost, **kwargs):
+
+    if _shared is None:
+        return
+    with _shared.get_lock():
+        if cost < _shared.value:
+            _shared.value = cost
+
+
+def tiebreaker(name, seed, **kwargs):
+    """
+    Return the open_set tiebreak for a strategy's tiebreak name.
+    """
+    if name == "fifo":
+        return None
+    if name == "lifo":
+        return lambda count: -count
+    if name == "random":
+        rng = random.Random(seed)
+        return lambda count: rng.random()
+    raise ValueError("unknown tiebreak {!r}, expected fifo, lifo or random".format(name))
+
+
+def run_strategy(job, **kwargs):
+    """
+    Plan every cover option of one (index, data, options, strategy, deadline)
+    job and return (index, moves, booms, finished, floor), where moves and
+    booms are the shortest plan found (both empty if none), finished is
+    False if the deadline or PLAN_LIMIT cut a search short, and floor is the cost every
+    search was bounded by: an exact strategy that finished has shown no plan
+    for these covers takes fewer actions.
+    """
+    index, data, options, plan, deadline = job
+    board = as_board(data)
+    whites = white_stacks(board)
+    cap = sum(n for sq, n in whites)
+    fields = {targets: distance_fields(board.black, targets, cap) for targets in options}
+
+    options = list(options)
+    if plan.order == "estimate":
+        options.sort(key=lambda targets: plan_estimate(whites, targets, fields[targets]))
+    elif plan.order == "shuffle":
+        random.Random(plan.seed).shuffle(options)
+    elif plan.order != "given":
+        raise ValueError("unknown order {!r}, expected estimate, given or shuffle".format(plan.order))
+
+    #Each search's bound is the best plan any worker has, and the lowest of them is
+    #the floor: an exact strategy that finished has shown nothing beats it
+    floors = []
+
+    def known():
+        cost = shared_bound()
+        floors.append(cost)
+        return cost if cost < NO_BOUND else None
+
+    def share(moves, booms):
+        publish(len(moves) + len(booms))
+        return True
+
+    best, finished = plan_covers(board, whites, options, fields, weight=plan.weight, known=known,
+        deadline=deadline, tiebreak=tiebreaker(plan.tiebreak, plan.seed), accept=share)
+    floor = min(floors, default=NO_BOUND)
+
+    if best is None:
+        return index, [], [], finished, floor
+    return index, best[0], best[1], finished, min(floor, len(best[0]) + len(best[1]))
+
+
+def solve_portfolio(data, strategies=None, workers=None, deadline_ms=None, **kwargs):
+    """
+    Solve data with every strategy in strategies (default STRATEGIES) on up
+    to workers processes (default one per strategy, at most one per CPU),
+    and return the result as an anytime solution. Without deadline_ms the
+    first verified plan is returned; with it, the best verified plan found
+    within deadline_ms milliseconds. Either way the workers still running
+    are cancelled. optimal is set when an exact strategy planned every
+    option to the end.
+    """
+    if strategies is None:
+        strategies = STRATEGIES
+    if workers is None:
+        workers = min(len(strategies), os.cpu_count() or 1)
+    deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms/1000
+    best = solution()
+
+    covers = find_solution(data, every=True, file=io.StringIO())
+    if -1 in covers[0]:
+        return best
+    options = tuple(cover_options(covers))
+
+    bound = multiprocessing.Value("i", NO_BOUND)
+    jobs = [(index, data, options, strategies[index], deadline) for index in range(0, len(strategies))]
+    pool = multiprocessing.Pool(workers, initializer=_share, initargs=(bound,))
+    try:
+        results = pool.imap_unordered(run_strategy, jobs)
+        for _ in jobs:
+            wait = None if deadline is None else max(0, deadline - time.perf_counter())
+            try:
+                index, moves, booms, finished, floor = results.next(wait)
+            except multiprocessing.TimeoutError:
+                break
+            best.passes += 1
+
+            #A worker's plan is replayed here before it can replace the best one
+            candidate = solution("solved", moves, booms, best.passes)
+            if booms and (not best.solved() or candidate.cost() < best.cost()) and \
+                    verify(data, plan_actions(moves, booms)).ok():
+                best = candidate
+            if strategies[index].weight == 1 and finished and best.solved() and best.cost() <= floor:
+                best.optimal = True
+
+            if best.solved() and (deadline is None or best.optimal):
+                break
+    finally:
+        #Cancels every strategy still searching
+        pool.terminate()
+        pool.join()
+
+    return best
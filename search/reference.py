@@ -0,0 +1,251 @@
+"""
+This module replays the reference boards in reference.jsonl, next to it,
+to catch regressions anywhere from the island graph to the printed plan.
+Each record holds a board and the number of actions the solver's plan for
+it took when the record was written (null when it had none). For every
+board the check:
+
+- solves it and replays the plan with game.verify, which must call it a
+  win, and no longer than the recorded plan;
+- replays the plan cut short and with an extra boom, which verify must
+  reject, so the simulator can't be passing everything;
+- compares min_covers with a brute force over the same keys;
+- compares island_graph.update, after each black token is taken away and
+  after a black token is added next to each island, with a graph built
+  from scratch;
+- checks that orient gives the same mask for all 8 symmetric copies of the
+  black mask, and that its symmetry really produces it.
+
+It also checks that rank numbers the token multisets of every length the
+tablebase uses with no gaps or repeats. It then builds a tablebase of one
+white token against one black token and replays its plan for every such
+position, which must win in as few actions as the solver's. Run it with
+python -m search.bench --reference.
+"""
+
+import io
+import json
+import os
+import tempfile
+from itertools import combinations, combinations_with_replacement
+
+from search.board import BLAST, SQUARES, SYMMETRIES, as_board, bits, components, coords
+from search.cover import dominant, min_covers
+from search.game import plan_actions, verify
+from search.islands import island_graph
+from search.tablebase import chunk_size, generate, map_mask, orient, rank, tablebase
+from search.util import finalise_win_pos, move_function, search_limit
+
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference.jsonl")
+
+#Token counts whose multisets rank is checked over (the tablebase's default size is 2)
+RANK_TOKENS = 3
+
+
+def load_reference(path=REFERENCE, **kwargs):
+    """
+    Return the records of a reference file, one per non-blank line.
+    """
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def solve(data, **kwargs):
+    """
+    Return the solver's actions for data, as find_solution and
+    move_function find them, or None when it finds no solution.
+    """
+    board = as_board(data)
+    graph = island_graph(board.black)
+    covers = finalise_win_pos(data, board, graph, every=True, file=io.StringIO())
+    if -1 in covers[0]:
+        return None
+    try:
+        paths, booms = move_function(data, covers[0], covers=covers)
+    except search_limit:
+        return None
+    if not booms:
+        return None
+    return plan_actions(paths, booms)
+
+
+def check_plan(record, **kwargs):
+
+    actions = solve(record["board"])
+    if actions is None:
+        if record["actions"] is not None:
+            return ["no plan found, the reference plan took {} actions".format(record["actions"])]
+        return []
+
+    problems = []
+    result = verify(record["board"], actions)
+    if not result.ok():
+        problems.append("verify: {}".format(result.as_dict()))
+    elif record["actions"] is not None and len(actions) > record["actions"]:
+        problems.append("plan takes {} actions, the reference plan {}".format(len(actions), record["actions"]))
+
+    if verify(record["board"], actions[:-1]).status != "incomplete":
+        problems.append("verify accepted the plan without its last action")
+    if verify(record["board"], actions + [actions[-1]]).status != "illegal":
+        problems.append("verify accepted a boom after the game was won")
+    return problems
+
+
+def brute_cover(keys, goal, limit, **kwargs):
+
+    #The fewest keys that together clear goal, trying every combination
+    keys = dominant(keys)
+    for size in range(1, limit+1):
+        for chosen in combinations(keys, size):
+            cleared = 0
+            for key in chosen:
+                cleared |= key
+            if cleared & goal == goal:
+                return size
+    return None
+
+
+def check_covers(data, **kwargs):
+
+    board = as_board(data)
+    graph = island_graph(board.black)
+    limit = board.white_tokens()
+    covers = min_covers(graph.groups, graph.goal(), limit, graph.isolated, every=True)
+    size = brute_cover(list(graph.groups), graph.goal(), limit)
+
+    problems = []
+    if size is None:
+        if covers:
+            problems.append("min_covers found a cover where none fits in {} booms".format(limit))
+        return problems
+    if not covers:
+        return ["min_covers found no cover, brute force one of {}".format(size)]
+    for cover in covers:
+        cleared = 0
+        for key in cover:
+            cleared |= key
+        if cleared != graph.goal() or any(key not in graph.groups for key in cover):
+            problems.append("min_covers returned {}, which doesn't clear every island".format(cover))
+        elif len(cover) != size:
+            problems.append("min_covers returned {} keys, brute force {}".format(len(cover), size))
+    return problems
+
+
+def graph_shape(graph, **kwargs):
+
+    #The graph with island numbers replaced by the islands themselves, so two
+    #graphs that number their islands differently still compare equal
+    def islands_of(key):
+        return frozenset(graph.islands[i] for i in bits(key))
+    return (sorted(graph.islands),
+        {islands_of(key): sorted(squares) for key, squares in graph.groups.items()},
+        islands_of(graph.isolated))
+
+
+def check_update(data, **kwargs):
+
+    black = as_board(data).black
+    graph = island_graph(black)
+    changes = [black & ~(1 << sq) for sq in bits(black)]
+    #A black token added beside each island, merging it with any island it touches
+    for island in components(black):
+        free = BLAST[min(bits(island))] & ~black
+        if free:
+            changes.append(black | free & -free)
+
+    problems = []
+    for changed in changes:
+        if graph_shape(graph.update(changed)) != graph_shape(island_graph(changed)):
+            problems.append("island_graph.update differs from a fresh graph for black {:#x}".format(changed))
+    return problems
+
+
+def check_orient(data, **kwargs):
+
+    black = as_board(data).black
+    mask, t = orient(black)
+    problems = []
+    if map_mask(black, SYMMETRIES[t]) != mask:
+        problems.append("orient's symmetry {} doesn't produce its mask".format(t))
+    for other in range(8):
+        if orient(map_mask(black, SYMMETRIES[other]))[0] != mask:
+            problems.append("orient differs for the copy under symmetry {}".format(other))
+    return problems
+
+
+def check_rank(tokens=RANK_TOKENS, **kwargs):
+    """
+    Return problems with rank: for every count of tokens up to tokens, the
+    sorted squares lists must rank to exactly 0 .. chunk_size - 1.
+    """
+    problems = []
+    for n in range(1, tokens+1):
+        ranks = sorted(rank(list(squares)) for squares in combinations_with_replacement(range(SQUARES), n))
+        if ranks != list(range(chunk_size(n))):
+            problems.append("rank doesn't number the {}-token multisets 0 .. {}".format(n, chunk_size(n)-1))
+    return problems
+
+
+def check_tablebase(**kwargs):
+    """
+    Return problems with a tablebase of one white token and one black token,
+    built in a temporary directory: for every such position its plan must
+    win, in as many actions as the solver's plan takes, and it must call a
+    position lost only when the solver finds no plan either.
+    """
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "reference.tb")
+        generate(path, whites=1, blacks=1, workers=1)
+        table = tablebase(path)
+        try:
+            for white in range(SQUARES):
+                for black in range(SQUARES):
+                    if white == black:
+                        continue
+                    data = {"white": [[1, *coords(white)]], "black": [[1, *coords(black)]]}
+                    problems += check_position(table, data)
+        finally:
+            table.close()
+    return problems
+
+
+def check_position(table, data, **kwargs):
+
+    try:
+        plan = table.plan(data)
+    except Exception as error:
+        return ["the tablebase plan for {} fails: {}: {}".format(data, type(error).__name__, error)]
+    if plan is None:
+        return ["the tablebase doesn't cover {}".format(data)]
+    actions = solve(data)
+    paths, booms = plan
+    if not booms:
+        if actions is not None:
+            return ["the tablebase calls {} lost, the solver wins in {}".format(data, len(actions))]
+        return []
+
+    result = verify(data, plan_actions(paths, booms))
+    if not result.ok():
+        return ["the tablebase plan for {}: {}".format(data, result.as_dict())]
+    if actions is None or len(actions) != len(paths) + len(booms):
+        return ["the tablebase plan for {} takes {} actions, the solver's {}".format(data,
+            len(paths) + len(booms), None if actions is None else len(actions))]
+    return []
+
+
+CHECKS = [check_covers, check_update, check_orient]
+
+
+def check_reference(path=REFERENCE, **kwargs):
+    """
+    Run every check over the reference boards in path and return the
+    problems found, as (board name, message) pairs; none when all passed.
+    """
+    problems = [("rank", problem) for problem in check_rank()]
+    problems += [("tablebase", problem) for problem in check_tablebase()]
+    for record in load_reference(path):
+        problems += [(record["name"], problem) for problem in check_plan(record)]
+        for check in CHECKS:
+            problems += [(record["name"], problem) for problem in check(record["board"])]
+    return problems
@@ -0,0 +1,259 @@
+"""
+This module runs the solver as a long-lived service, so each request costs
+only its search and not the interpreter start-up, imports and table
+building. Requests are newline-delimited JSON-RPC 2.0 over a Unix socket or
+stdin/stdout. An asyncio loop accepts them concurrently and hands the solves
+to a pool of warm worker processes, each keeping its tables and solution
+cache between requests. When queue requests are in flight the service stops
+reading further requests until one finishes, so clients are slowed down
+rather than the queue growing without limit.
+
+Methods:
+solve -- params {"board": {...}, "deadline": ms, "timeout": s}; deadline and
+    timeout are optional. The result is the same record batch mode writes.
+ping -- returns "pong".
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from search import batch
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+def warm_worker(options, **kwargs):
+
+    #Open the shared cache up front so the first request doesn't pay for it
+    if options.get("cache") is not None:
+        batch.open_cache(options["cache"])
+
+
+def reply(id, result=None, error=None, **kwargs):
+
+    message = {"jsonrpc": "2.0", "id": id}
+    if error is not None:
+        message["error"] = {"code": error[0], "message": error[1]}
+    else:
+        message["result"] = result
+    return message
+
+
+def request_id(line, **kwargs):
+
+    #The id of a request line, or None if it has none or doesn't parse
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return None
+    return request.get("id") if isinstance(request, dict) else None
+
+
+class solver_service:
+    """
+    Dispatches JSON-RPC requests to a process pool of workers, allowing at
+    most queue requests in flight at once.
+    """
+    def __init__(self, workers=None, queue=64, options=None):
+        self.options = dict(options or {})
+        self.workers = workers
+        self.pool = self.start_pool()
+        self.queue = queue
+        self.slots = None
+        self.served = 0
+
+    def start_pool(self):
+
+        return ProcessPoolExecutor(self.workers, initializer=warm_worker,
+            initargs=(self.options,))
+
+    async def handle(self, reader, writer):
+        """
+        Serve one connection until the client closes it.
+        """
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.queue)
+        lock = asyncio.Lock()
+        pending = set()
+
+        while True:
+            #Backpressure: don't read another request until there is room for it
+            await self.slots.acquire()
+            line = await reader.readline()
+            if not line:
+                self.slots.release()
+                break
+            task = asyncio.ensure_future(self.respond(line, writer, lock))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.gather(*pending)
+        writer.close()
+
+    async def respond(self, line, writer, lock):
+
+        try:
+            message = await self.dispatch(line)
+        except Exception as error:
+            #Every request still gets its reply, even when a worker died under it
+            id = request_id(line)
+            message = None if id is None else reply(id, error=(INTERNAL_ERROR,
+                "{}: {}".format(type(error).__name__, error)))
+        finally:
+            self.slots.release()
+        if message is None:
+            return
+        async with lock:
+            writer.write((json.dumps(message) + "\n").encode())
+            await writer.drain()
+
+    async def dispatch(self, line):
+        """
+        Run one request line and return the response (None for a
+        notification, which has no id).
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            return reply(None, error=(PARSE_ERROR, str(error)))
+        if not isinstance(request, dict) or "method" not in request:
+            return reply(None, error=(INVALID_REQUEST, "not a JSON-RPC request"))
+
+        id = request.get("id")
+        method = request["method"]
+        params = request.get("params") or {}
+
+        if method == "ping":
+            result = "pong"
+        elif method == "solve":
+            if not isinstance(params, dict) or not isinstance(params.get("board"), dict):
+                return reply(id, error=(INVALID_PARAMS, "params.board must be a board object"))
+            options = dict(self.options)
+            for name in ("deadline", "timeout"):
+                value = params.get(name)
+                if value is None:
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not value >= 0:
+                    return reply(id, error=(INVALID_PARAMS, "params.{} must be a non-negative number".format(name)))
+                options[name] = value
+            if options.get("cache") is not None and options.get("deadline") is not None:
+                return reply(id, error=(INVALID_PARAMS, "deadline can't be used with the service's cache"))
+            job = (params.get("name", str(id)), json.dumps(params["board"]), options)
+            loop = asyncio.get_running_loop()
+            pool = self.pool
+            try:
+                result = await loop.run_in_executor(pool, batch.solve_board, job)
+            except BrokenProcessPool:
+                #A worker was killed: later requests get a fresh pool
+                if self.pool is pool:
+                    self.pool = self.start_pool()
+                    pool.shutdown(wait=False)
+                raise
+            self.served += 1
+        else:
+            return reply(id, error=(METHOD_NOT_FOUND, "unknown method {!r}".format(method)))
+
+        if id is None:
+            return None
+        return reply(id, result)
+
+    def close(self):
+
+        self.pool.shutdown()
+
+
+async def serve_socket(service, path, **kwargs):
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(service.handle, path=path)
+    async with server:
+        await server.serve_forever()
+
+
+class stdout_writer:
+    """
+    The writer half of a stream for stdout, which may be a file rather than
+    a pipe. Replies are small, so a blocking write and flush is fine.
+    """
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        self.file.write(data)
+
+    async def drain(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.flush()
+
+
+class stdin_reader:
+    """
+    The reader half of a stream for stdin when it is a regular file, which
+    the event loop can't watch. Each line is read on a thread so the loop
+    keeps running, and only when handle asks for it, so backpressure holds.
+    """
+    def __init__(self, file):
+        self.file = file
+
+    async def readline(self):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.file.readline)
+
+
+async def serve_stdio(service, **kwargs):
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    except ValueError:
+        #Pipe transports only take pipes, sockets and terminals, not `< requests.txt`
+        reader = stdin_reader(sys.stdin.buffer)
+    await service.handle(reader, stdout_writer(sys.stdout.buffer))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m search.service")
+    parser.add_argument("--socket", default=None,
+        help="Unix socket path to listen on (default: serve stdin/stdout)")
+    parser.add_argument("--workers", type=int, default=None,
+        help="worker processes (default: one per CPU)")
+    parser.add_argument("--queue", type=int, default=64,
+        help="requests in flight before the service stops reading new ones")
+    parser.add_argument("--cache", default=None, help="solution cache file")
+    parser.add_argument("--timeout", type=float, default=None,
+        help="default seconds allowed per board")
+    parser.add_argument("--deadline", type=float, default=None,
+        help="default anytime deadline in milliseconds")
+    args = parser.parse_args()
+    if args.cache is not None and args.deadline is not None:
+        parser.error("--cache can't be used with --deadline: anytime plans are not cached")
+
+    service = solver_service(args.workers, args.queue,
+        {"cache": args.cache, "timeout": args.timeout, "deadline": args.deadline})
+    try:
+        if args.socket is not None:
+            asyncio.run(serve_socket(service, args.socket))
+        else:
+            asyncio.run(serve_stdio(service))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+This module collects solver statistics: per-search node counters (generated,
+expanded, deduplicated, heap high-water mark) and per-phase wall times. It is
+switched on with enable() or the SEARCH_STATS environment variable; while it
+is off no board record exists and the solver skips all bookkeeping. A solve
+can also be wrapped in cProfile and tracemalloc with profiled(), which
+imports them only when they are used.
+"""
+
+import functools
+import json
+import os
+import sys
+import time
+
+ENABLED = os.environ.get("SEARCH_STATS", "") not in ("", "0")
+
+#The record of the board being solved, or None when stats are off
+_current = None
+
+
+class board_stats:
+    """
+    Counters and timings for one board.
+    """
+    def __init__(self):
+        self.searches = {}
+        self.phases = {}
+        self.memory = None
+
+    def search(self, name):
+        return self.searches.setdefault(name, {})
+
+    def as_dict(self):
+        record = {"searches": self.searches, "phases": self.phases}
+        if self.memory is not None:
+            record["memory"] = self.memory
+        return record
+
+
+def enable(flag=True, **kwargs):
+
+    global ENABLED
+    ENABLED = flag
+
+
+def begin(**kwargs):
+    """
+    Start the record for a new board, if stats are enabled, and return it.
+    """
+    global _current
+    _current = board_stats() if ENABLED else None
+    return _current
+
+
+def end(**kwargs):
+    """
+    Finish the current board and return its record (None if stats are off).
+    """
+    global _current
+    record = _current
+    _current = None
+    return record
+
+
+def search(name, **kwargs):
+    """
+    Return the counter dict for the named search of the current board, or
+    None when no board is being recorded.
+    """
+    if _current is None:
+        return None
+    return _current.search(name)
+
+
+def timed(name):
+    """
+    Decorator adding the wall time of every call of a phase function to the
+    current board's record under name.
+    """
+    def wrap(func):
+        @functools.wraps(func)
+        def timed_func(*args, **kwargs):
+            record = _current
+            if record is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record.phases[name] = record.phases.get(name, 0) + time.perf_counter() - start
+        return timed_func
+    return wrap
+
+
+def tally(stats, name, amount, **kwargs):
+
+    #Add to a search counter, if the caller asked for counters
+    if stats is not None:
+        stats[name] = stats.get(name, 0) + amount
+
+
+def high_water(stats, name, value, **kwargs):
+
+    if stats is not None and value > stats.get(name, 0):
+        stats[name] = value
+
+
+def dump(record, file=sys.stderr, **kwargs):
+    """
+    Write a board record as one JSON line.
+    """
+    if record is not None:
+        file.write(json.dumps(record.as_dict()) + "\n")
+
+
+class profiled:
+    """
+    Context manager that runs its body under cProfile (saving the profile to
+    profile if given) and, with memory=True, tracemalloc, whose peak is
+    stored in the current board record.
+    """
+    def __init__(self, profile=None, memory=False, top=20):
+        self.profile = profile
+        self.memory = memory
+        self.top = top
+        self.profiler = None
+
+    def __enter__(self):
+        #The profilers are only imported when asked for, to keep start-up quick
+        if self.memory:
+            import tracemalloc
+            tracemalloc.start()
+        if self.profile is not None:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile)
+            import pstats
+            pstats.Stats(self.profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(self.top)
+        if self.memory:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if _current is not None:
+                _current.memory = {"current": current, "peak": peak}
+        return False
@@ -0,0 +1,489 @@
+"""
+This module builds and reads an endgame tablebase: for every position with
+at most a few white tokens and a few black stacks, the fewest actions to win
+and the action that starts such a plan. Plans follow the solver's shape, all
+moves first and then all booms, so a position is worth the fewest booms that
+win from it without moving, or one more than the best position a move leads
+to. Heights of black stacks never matter (a boom takes a whole stack), so
+positions are keyed by the black mask, reduced to its smallest form under
+the 8 symmetries of the board, and by the white tokens.
+
+The table is built by retrograde analysis. A boom always costs at least one
+white token, so the positions are solved in order of white tokens: the boom
+values of a chunk (one black mask, one token count) come from chunks already
+solved, and then every value is carried back to the positions one move
+earlier, nearest first. Chunks are solved in parallel, each written to its
+own part file as soon as it is done, so an interrupted run picks up where it
+stopped. The parts are then packed into one file: a header, a hash table of
+chunks and the chunk entries, read through a memory map with no other
+loading. An entry is found with one hash probe and one read.
+"""
+
+import array
+import math
+import mmap
+import os
+import struct
+import sys
+from itertools import combinations, combinations_with_replacement
+
+from search.board import INVERSES, RAYS, SQUARES, SYMMETRIES, as_board, bits, chain, coords, count
+
+MAGIC = b"EXPTB\x00\x00\x01"
+#magic, white tokens, black stacks, hash slots, chunks
+HEADER = struct.Struct("<8sIIII")
+#black mask, byte offset << 8 | white tokens
+SLOT = struct.Struct("<QQ")
+ENTRY = struct.Struct("<I")
+
+#A value for positions that can't be won (or don't exist, like a white token on a black one)
+LOST = 255
+LOST_ENTRY = LOST << 24 | LOST << 16
+#Set in an entry's action when it is a boom; otherwise it is a move packed as n << 12 | start << 6 | end
+BOOM_FLAG = 1 << 15
+#A move's n has to fit in the 3 bits below BOOM_FLAG
+MAX_WHITES = 7
+
+#The tablebase find_solution and move_function consult, opened by use() or SEARCH_TABLEBASE
+_active = None
+_checked = False
+#Part files open in this (worker) process
+_stores = {}
+
+
+def map_mask(mask, table, **kwargs):
+
+    moved = 0
+    for sq in bits(mask):
+        moved |= 1 << table[sq]
+    return moved
+
+
+def orient(black, **kwargs):
+    """
+    Return (mask, t): the smallest form of the black mask under the board's
+    symmetries and the symmetry t that produces it.
+    """
+    best = None
+    for t in range(8):
+        mapped = map_mask(black, SYMMETRIES[t])
+        if best is None or mapped < best[0]:
+            best = (mapped, t)
+    return best
+
+
+def chunk_size(tokens, **kwargs):
+
+    #Multisets of tokens squares, one entry each
+    return math.comb(SQUARES+tokens-1, tokens)
+
+
+def rank(squares, **kwargs):
+    """
+    Return the index of a sorted list of squares (a square repeated once per
+    token on it) among all such lists of the same length.
+    """
+    index = 0
+    for element in range(0, len(squares)):
+        index += math.comb(squares[element] + element, element+1)
+    return index
+
+
+def entry_value(entry, **kwargs):
+    return entry >> 24
+
+
+def entry_booms(entry, **kwargs):
+    return entry >> 16 & 255
+
+
+def lookup(read, black, whites, **kwargs):
+    """
+    Return (entry, t) for the white stacks whites against black, where
+    read(mask, tokens, index) reads an entry of a chunk and t is the symmetry
+    the chunk's frame is in. entry is None if read has no such chunk.
+    """
+    mask, t = orient(black)
+    moved = SYMMETRIES[t]
+    squares = sorted(moved[sq] for sq, h in whites for _ in range(h))
+    return read(mask, len(squares), rank(squares)), t
+
+
+def apply_move(whites, n, start, end, **kwargs):
+
+    heights = dict(whites)
+    heights[start] -= n
+    heights[end] = heights.get(end, 0) + n
+    return tuple(sorted((sq, h) for sq, h in heights.items() if h))
+
+
+def boom_results(black, whites, **kwargs):
+    """
+    Yield (sq, black, whites) for a boom on every white stack: what is left
+    of both colours after its chain.
+    """
+    occupied = black
+    for sq, h in whites:
+        occupied |= 1 << sq
+    for sq, h in whites:
+        gone = chain(occupied, sq)
+        yield sq, black & ~gone, tuple(pair for pair in whites if not gone >> pair[0] & 1)
+
+
+def unmoves(black, whites, **kwargs):
+    """
+    Yield ((n, start, end), before) for every move that leads from before to
+    whites: n tokens that came to end from a square start that isn't black,
+    no further away than the stack on start was tall.
+    """
+    heights = dict(whites)
+    tokens = sum(heights.values())
+    for end, h in whites:
+        for n in range(1, h+1):
+            for line in RAYS[end]:
+                for steps in range(1, min(tokens, len(line))+1):
+                    start = line[steps-1]
+                    if black >> start & 1 or steps > heights.get(start, 0) + n:
+                        continue
+                    before = dict(heights)
+                    before[end] -= n
+                    before[start] = before.get(start, 0) + n
+                    yield (n, start, end), tuple(sorted((sq, m) for sq, m in before.items() if m))
+
+
+class part_store:
+    """
+    The chunks of a tablebase being built, one part file each in directory.
+    Chunks read back are kept in memory for the rest of the run.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.chunks = {}
+
+    def path(self, black, tokens):
+        return os.path.join(self.directory, "{}-{:016x}.part".format(tokens, black))
+
+    def done(self, black, tokens):
+        return os.path.exists(self.path(black, tokens))
+
+    def read(self, black, tokens, index):
+
+        key = (black, tokens)
+        if key not in self.chunks:
+            entries = array.array("I")
+            with open(self.path(black, tokens), "rb") as file:
+                entries.frombytes(file.read())
+            self.chunks[key] = entries
+        return self.chunks[key][index]
+
+    def write(self, black, tokens, entries):
+
+        #Written under another name first, so a part file is never half there
+        path = self.path(black, tokens)
+        with open(path + ".tmp", "wb") as file:
+            entries.tofile(file)
+        os.replace(path + ".tmp", path)
+
+
+def open_store(directory, **kwargs):
+
+    if directory not in _stores:
+        _stores[directory] = part_store(directory)
+    return _stores[directory]
+
+
+def solve_chunk(job, **kwargs):
+    """
+    Solve the (directory, black, tokens) chunk, every position of tokens
+    white tokens against the black mask black, and write its part file.
+    Every chunk with fewer white tokens has to be done already.
+    """
+    directory, black, tokens = job
+    store = open_store(directory)
+    if store.done(black, tokens):
+        return black, tokens
+
+    size = chunk_size(tokens)
+    value = bytearray([LOST])*size
+    booms = bytearray([LOST])*size
+    action = array.array("H", [0])*size
+    positions = {}
+    buckets = {}
+
+    #Winning by booms alone: one boom, then the best boom-only win of what is left
+    free = [sq for sq in range(SQUARES) if not black >> sq & 1]
+    for squares in combinations_with_replacement(free, tokens):
+        index = rank(squares)
+        whites = tuple(sorted((sq, squares.count(sq)) for sq in set(squares)))
+        positions[index] = whites
+
+        best = LOST
+        for sq, left, rest in boom_results(black, whites):
+            if not left:
+                worth = 1
+            elif rest:
+                worth = 1 + entry_booms(lookup(store.read, left, rest)[0])
+            else:
+                continue
+            if worth < best:
+                best = worth
+                action[index] = BOOM_FLAG | sq
+        booms[index] = value[index] = min(best, LOST)
+        if best < LOST:
+            buckets.setdefault(best, []).append(index)
+
+    #Carry every value back one move at a time, nearest to a win first
+    worth = 1
+    while buckets and worth < LOST-1:
+        for index in buckets.pop(worth, []):
+            if value[index] != worth:
+                continue
+            for (n, start, end), before in unmoves(black, positions[index]):
+                earlier = rank([sq for sq, h in before for _ in range(h)])
+                if value[earlier] > worth+1:
+                    value[earlier] = worth+1
+                    action[earlier] = n << 12 | start << 6 | end
+                    buckets.setdefault(worth+1, []).append(earlier)
+        worth += 1
+
+    entries = array.array("I", [LOST_ENTRY])*size
+    for index in positions:
+        entries[index] = value[index] << 24 | booms[index] << 16 | action[index]
+    store.write(black, tokens, entries)
+    return black, tokens
+
+
+def canonical_masks(blacks, **kwargs):
+    """
+    Return every black mask of 1 to blacks squares that is its own smallest
+    form under the board's symmetries.
+    """
+    masks = []
+    for size in range(1, blacks+1):
+        for squares in combinations(range(SQUARES), size):
+            mask = sum(1 << sq for sq in squares)
+            if orient(mask)[0] == mask:
+                masks.append(mask)
+    return masks
+
+
+def slot_of(black, tokens, slots, **kwargs):
+
+    return (((black ^ tokens) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32 & (slots-1)
+
+
+def pack(path, directory, masks, whites, blacks, **kwargs):
+    """
+    Write the tablebase file at path from the part files in directory.
+    """
+    chunks = [(mask, tokens) for tokens in range(1, whites+1) for mask in masks]
+    slots = 1
+    while slots < 2*len(chunks):
+        slots *= 2
+
+    table = [(0, 0)]*slots
+    offset = HEADER.size + SLOT.size*slots
+    for mask, tokens in chunks:
+        slot = slot_of(mask, tokens, slots)
+        while table[slot][0]:
+            slot = (slot+1) & (slots-1)
+        table[slot] = (mask, offset << 8 | tokens)
+        offset += ENTRY.size*chunk_size(tokens)
+
+    store = part_store(directory)
+    with open(path + ".tmp", "wb") as file:
+        file.write(HEADER.pack(MAGIC, whites, blacks, slots, len(chunks)))
+        for mask, where in table:
+            file.write(SLOT.pack(mask, where))
+        for mask, tokens in chunks:
+            entries = array.array("I")
+            with open(store.path(mask, tokens), "rb") as part:
+                entries.frombytes(part.read())
+            #The file is little-endian whatever machine built it
+            if sys.byteorder == "big":
+                entries.byteswap()
+            entries.tofile(file)
+    os.replace(path + ".tmp", path)
+
+
+def generate(path, whites=2, blacks=2, workers=None, progress=None, **kwargs):
+    """
+    Build the tablebase for up to whites white tokens and blacks black stacks
+    and write it to path, on workers processes (default one per CPU). Part
+    files go in path + ".parts" and are reused by a later run, which may
+    also raise either limit. progress, if given, is called with (tokens,
+    done, total) after every chunk.
+    """
+    if not 1 <= whites <= MAX_WHITES:
+        raise ValueError("whites must be from 1 to {}, not {}".format(MAX_WHITES, whites))
+    if blacks < 1:
+        raise ValueError("blacks must be at least 1, not {}".format(blacks))
+
+    #Only building needs worker processes; the solver just reads the file
+    from multiprocessing import Pool
+
+    directory = path + ".parts"
+    os.makedirs(directory, exist_ok=True)
+    masks = canonical_masks(blacks)
+    store = part_store(directory)
+
+    with Pool(workers) as pool:
+        #Each token count needs every smaller one finished first
+        for tokens in range(1, whites+1):
+            jobs = [(directory, mask, tokens) for mask in masks if not store.done(mask, tokens)]
+            done = len(masks) - len(jobs)
+            for _ in pool.imap_unordered(solve_chunk, jobs, chunksize=4):
+                done += 1
+                if progress is not None:
+                    progress(tokens, done, len(masks))
+
+    pack(path, directory, masks, whites, blacks)
+
+
+class tablebase:
+    """
+    A packed tablebase file, memory-mapped. whites and blacks are the most
+    white tokens and black stacks it covers.
+    """
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        #An empty file can't be mapped at all
+        if os.fstat(self.file.fileno()).st_size < HEADER.size:
+            self.file.close()
+            raise ValueError("{} is not a tablebase file".format(path))
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.whites, self.blacks, self.slots, self.chunks = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("{} is not a tablebase file".format(path))
+
+    def read(self, black, tokens, index):
+        """
+        Return entry index of the (black, tokens) chunk, or None if the
+        tablebase has no such chunk.
+        """
+        slot = slot_of(black, tokens, self.slots)
+        while True:
+            mask, where = SLOT.unpack_from(self.map, HEADER.size + SLOT.size*slot)
+            if not mask:
+                return None
+            if mask == black and where & 255 == tokens:
+                return ENTRY.unpack_from(self.map, (where >> 8) + ENTRY.size*index)[0]
+            slot = (slot+1) & (self.slots-1)
+
+    def covers(self, board):
+        tokens = sum(board.height[sq] for sq in bits(board.white))
+        return bool(board.black) and 0 < tokens <= self.whites and count(board.black) <= self.blacks
+
+    def plan(self, data):
+        """
+        Return the shortest (paths, booms) for data in the format
+        move_function returns, ([], []) if it can't be won, or None if the
+        tablebase doesn't cover it.
+        """
+        board = as_board(data)
+        if not self.covers(board):
+            return None
+        black = board.black
+        whites = tuple((sq, board.height[sq]) for sq in bits(board.white))
+        entry, t = lookup(self.read, black, whites)
+        if entry is None:
+            return None
+        if entry_value(entry) >= LOST:
+            return [], []
+
+        #Follow the stored moves (each in its chunk's frame) until a boom is best
+        paths = []
+        while not entry & BOOM_FLAG:
+            move = entry & 0xFFFF
+            n, start, end = move >> 12, INVERSES[t][move >> 6 & 63], INVERSES[t][move & 63]
+            paths.append((n, coords(start), coords(end)))
+            whites = apply_move(whites, n, start, end)
+            entry, t = lookup(self.read, black, whites)
+
+        #Then the boom that leaves the fewest booms to go, until black is gone
+        booms = []
+        while black:
+            best = None
+            for sq, left, rest in boom_results(black, whites):
+                if not left:
+                    worth = 0
+                elif rest:
+                    worth = entry_booms(lookup(self.read, left, rest)[0])
+                else:
+                    continue
+                if best is None or worth < best[0]:
+                    best = (worth, sq, left, rest)
+            booms.append(coords(best[1]))
+            black, whites = best[2], best[3]
+        return paths, booms
+
+    def close(self):
+
+        self.map.close()
+        self.file.close()
+
+
+def use(path, **kwargs):
+    """
+    Open the tablebase at path (None to close it) for find_solution and
+    move_function to consult.
+    """
+    global _active, _checked
+    if _active is not None:
+        _active.close()
+    _active = None if path is None else tablebase(path)
+    _checked = True
+    return _active
+
+
+def active(**kwargs):
+
+    #Opened on first use from SEARCH_TABLEBASE, if use() hasn't been called
+    global _checked
+    if not _checked:
+        _checked = True
+        if os.environ.get("SEARCH_TABLEBASE"):
+            use(os.environ["SEARCH_TABLEBASE"])
+    return _active
+
+
+def known_plan(data, **kwargs):
+    """
+    Return the tablebase plan for data, or None if no tablebase is open or
+    it doesn't cover data.
+    """
+    table = active()
+    if table is None:
+        return None
+    return table.plan(data)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m search.tablebase")
+    parser.add_argument("path", help="tablebase file to write")
+    parser.add_argument("--whites", type=int, default=2,
+        help="most white tokens covered, at most {}".format(MAX_WHITES))
+    parser.add_argument("--blacks", type=int, default=2, help="most black stacks covered")
+    parser.add_argument("--workers", type=int, default=None,
+        help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    if not 1 <= args.whites <= MAX_WHITES:
+        parser.error("--whites must be from 1 to {}".format(MAX_WHITES))
+    if args.blacks < 1:
+        parser.error("--blacks must be at least 1")
+
+    def progress(tokens, done, total):
+        print("\r{} white tokens: {}/{} chunks".format(tokens, done, total), end="",
+            file=sys.stderr, flush=True)
+        if done == total:
+            print(file=sys.stderr)
+
+    generate(args.path, whites=args.whites, blacks=args.blacks, workers=args.workers,
+        progress=progress)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,551 +1,472 @@
 """
-This module contains some helper functions for printing actions and boards.
-Feel free to use and/or modify them to help you develop your program.
+This module contains the solver: the island and win-position search, and the
+pathfinding that gets white tokens onto the winning squares. The helpers for
+printing actions and boards are in search.display.
 """
 
-def print_move(n, x_a, y_a, x_b, y_b, **kwargs):
-    """
-    Output a move action of n pieces from square (x_a, y_a)
-    to square (x_b, y_b), according to the format instructions.
-    """
-    print("MOVE {} from {} to {}.".format(n, (x_a, y_a), (x_b, y_b)), **kwargs)
-
-
-def print_boom(x, y, **kwargs):
-    """
-    Output a boom action initiated at square (x, y) according to
-    the format instructions.
-    """
-    print("BOOM at {}.".format((x, y)), **kwargs)
-
-
-def print_board(board_dict, message="", unicode=False, compact=True, **kwargs):
-    """
-    For help with visualisation and debugging: output a board diagram with
-    any information you like (tokens, heuristic values, distances, etc.).
-
-    Arguments:
-    board_dict -- A dictionary with (x, y) tuples as keys (x, y in range(8))
-        and printable objects (e.g. strings, numbers) as values. This function
-        will arrange these printable values on the grid and output the result.
-        Note: At most the first 3 characters will be printed from the string
-        representation of each value.
-    message -- A printable object (e.g. string, number) that will be placed
-        above the board in the visualisation. Default is "" (no message).
-    unicode -- True if you want to use non-ASCII symbols in the board
-        visualisation (see below), False to use only ASCII symbols.
-        Default is False, since the unicode symbols may not agree with some
-        terminal emulators.
-    compact -- True if you want to use a compact board visualisation, with
-        coordinates along the edges of the board, False to use a bigger one
-        with coordinates alongside the printable information in each square.
-        Default True (small board).
-
-    Any other keyword arguments are passed through to the print function.
-    """
-    if unicode:
-        if compact:
-            template = """# {}
-#    ┌───┬───┬───┬───┬───┬───┬───┬───┐
-#  7 │{:}│{:}│{:}│{:}│{:}│{:}│{:}│{:}│
-#    ├───┼───┼───┼───┼───┼───┼───┼───┤
-#  6 │{:}│{:}│{:}│{:}│{:}│{:}│{:}│{:}│
-#    ├───┼───┼───┼───┼───┼───┼───┼───┤
-#  5 │{:}│{:}│{:}│{:}│{:}│{:}│{:}│{:}│
-#    ├───┼───┼───┼───┼───┼───┼───┼───┤
-#  4 │{:}│{:}│{:}│{:}│{:}│{:}│{:}│{:}│
-#    ├───┼───┼───┼───┼───┼───┼───┼───┤
-#  3 │{:}│{:}│{:}│{:}│{:}│{:}│{:}│{:}│
-#    ├───┼───┼───┼───┼───┼───┼───┼───┤
-#  2 │{:}│{:}│{:}│{:}│{:}│{:}│{:}│{:}│
-#    ├───┼───┼───┼───┼───┼───┼───┼───┤
-#  1 │{:}│{:}│{:}│{:}│{:}│{:}│{:}│{:}│
-#    ├───┼───┼───┼───┼───┼───┼───┼───┤
-#  0 │{:}│{:}│{:}│{:}│{:}│{:}│{:}│{:}│
-#    └───┴───┴───┴───┴───┴───┴───┴───┘
-# y/x  0   1   2   3   4   5   6   7"""
-        else:
-            template = """# {}
-# ┌─────┬─────┬─────┬─────┬─────┬─────┬─────┬─────┐
-# │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │
-# │ 0,7 │ 1,7 │ 2,7 │ 3,7 │ 4,7 │ 5,7 │ 6,7 │ 7,7 │
-# ├─────┼─────┼─────┼─────┼─────┼─────┼─────┼─────┤
-# │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │
-# │ 0,6 │ 1,6 │ 2,6 │ 3,6 │ 4,6 │ 5,6 │ 6,6 │ 7,6 │
-# ├─────┼─────┼─────┼─────┼─────┼─────┼─────┼─────┤
-# │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │
-# │ 0,5 │ 1,5 │ 2,5 │ 3,5 │ 4,5 │ 5,5 │ 6,5 │ 7,5 │
-# ├─────┼─────┼─────┼─────┼─────┼─────┼─────┼─────┤
-# │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │
-# │ 0,4 │ 1,4 │ 2,4 │ 3,4 │ 4,4 │ 5,4 │ 6,4 │ 7,4 │
-# ├─────┼─────┼─────┼─────┼─────┼─────┼─────┼─────┤
-# │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │
-# │ 0,3 │ 1,3 │ 2,3 │ 3,3 │ 4,3 │ 5,3 │ 6,3 │ 7,3 │
-# ├─────┼─────┼─────┼─────┼─────┼─────┼─────┼─────┤
-# │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │
-# │ 0,2 │ 1,2 │ 2,2 │ 3,2 │ 4,2 │ 5,2 │ 6,2 │ 7,2 │
-# ├─────┼─────┼─────┼─────┼─────┼─────┼─────┼─────┤
-# │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │
-# │ 0,1 │ 1,1 │ 2,1 │ 3,1 │ 4,1 │ 5,1 │ 6,1 │ 7,1 │
-# ├─────┼─────┼─────┼─────┼─────┼─────┼─────┼─────┤
-# │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │ {:} │
-# │ 0,0 │ 1,0 │ 2,0 │ 3,0 │ 4,0 │ 5,0 │ 6,0 │ 7,0 │
-# └─────┴─────┴─────┴─────┴─────┴─────┴─────┴─────┘"""
-    else:
-        if compact:
-            template = """# {}
-#    +---+---+---+---+---+---+---+---+
-#  7 |{:}|{:}|{:}|{:}|{:}|{:}|{:}|{:}|
-#    +---+---+---+---+---+---+---+---+
-#  6 |{:}|{:}|{:}|{:}|{:}|{:}|{:}|{:}|
-#    +---+---+---+---+---+---+---+---+
-#  5 |{:}|{:}|{:}|{:}|{:}|{:}|{:}|{:}|
-#    +---+---+---+---+---+---+---+---+
-#  4 |{:}|{:}|{:}|{:}|{:}|{:}|{:}|{:}|
-#    +---+---+---+---+---+---+---+---+
-#  3 |{:}|{:}|{:}|{:}|{:}|{:}|{:}|{:}|
-#    +---+---+---+---+---+---+---+---+
-#  2 |{:}|{:}|{:}|{:}|{:}|{:}|{:}|{:}|
-#    +---+---+---+---+---+---+---+---+
-#  1 |{:}|{:}|{:}|{:}|{:}|{:}|{:}|{:}|
-#    +---+---+---+---+---+---+---+---+
-#  0 |{:}|{:}|{:}|{:}|{:}|{:}|{:}|{:}|
-#    +---+---+---+---+---+---+---+---+
-# y/x  0   1   2   3   4   5   6   7"""
-        else:
-            template = """# {}
-# +-----+-----+-----+-----+-----+-----+-----+-----+
-# | {:} | {:} | {:} | {:} | {:} | {:} | {:} | {:} |
-# | 0,7 | 1,7 | 2,7 | 3,7 | 4,7 | 5,7 | 6,7 | 7,7 |
-# +-----+-----+-----+-----+-----+-----+-----+-----+
-# | {:} | {:} | {:} | {:} | {:} | {:} | {:} | {:} |
-# | 0,6 | 1,6 | 2,6 | 3,6 | 4,6 | 5,6 | 6,6 | 7,6 |
-# +-----+-----+-----+-----+-----+-----+-----+-----+
-# | {:} | {:} | {:} | {:} | {:} | {:} | {:} | {:} |
-# | 0,5 | 1,5 | 2,5 | 3,5 | 4,5 | 5,5 | 6,5 | 7,5 |
-# +-----+-----+-----+-----+-----+-----+-----+-----+
-# | {:} | {:} | {:} | {:} | {:} | {:} | {:} | {:} |
-# | 0,4 | 1,4 | 2,4 | 3,4 | 4,4 | 5,4 | 6,4 | 7,4 |
-# +-----+-----+-----+-----+-----+-----+-----+-----+
-# | {:} | {:} | {:} | {:} | {:} | {:} | {:} | {:} |
-# | 0,3 | 1,3 | 2,3 | 3,3 | 4,3 | 5,3 | 6,3 | 7,3 |
-# +-----+-----+-----+-----+-----+-----+-----+-----+
-# | {:} | {:} | {:} | {:} | {:} | {:} | {:} | {:} |
-# | 0,2 | 1,2 | 2,2 | 3,2 | 4,2 | 5,2 | 6,2 | 7,2 |
-# +-----+-----+-----+-----+-----+-----+-----+-----+
-# | {:} | {:} | {:} | {:} | {:} | {:} | {:} | {:} |
-# | 0,1 | 1,1 | 2,1 | 3,1 | 4,1 | 5,1 | 6,1 | 7,1 |
-# +-----+-----+-----+-----+-----+-----+-----+-----+
-# | {:} | {:1} | {:} | {:} | {:} | {:} | {:} | {:} |
-# | 0,0 | 1,0 | 2,0 | 3,0 | 4,0 | 5,0 | 6,0 | 7,0 |
-# +-----+-----+-----+-----+-----+-----+-----+-----+"""
-    # board the board string
-    coords = [(x,7-y) for y in range(8) for x in range(8)]
-    cells = []
-    for xy in coords:
-        if xy not in board_dict:
-            cells.append("   ")
-        else:
-            cells.append(str(board_dict[xy])[:3].center(3))
-    # print it
-    print(template.format(message, *cells), **kwargs)
-
-
-
 # Student made functions follow below
 
 #Define Global Variables
-z=0
-x=1
-y=2
-stack=0
-BUDGET=75
-STATE=2
+TABLE_SIZE=100000
+PLAN_LIMIT=200000
 
 import heapq
+import os
+import sys
+import time
+from collections import OrderedDict
+
+from search.game import move_successors
+from search.board import as_board, bits, chain, coords, square
+from search.cover import COVER_LIMIT, cover_targets, min_covers
+from search.distance import distance_fields, min_cost_matching, movements, rings
+from search.islands import island_graph
+from search.output import serialise
+from search.stats import high_water, tally, timed
+from search import stats as search_stats
+
+#Still importable from here, as they were before they moved to search.display
+from search.display import print_board, print_boom, print_move
+
+#The open tablebase's plan for board, or None. search.tablebase is only
+#imported once a table has been asked for (--tablebase or SEARCH_TABLEBASE)
+def tablebase_plan(board):
+
+    if "search.tablebase" not in sys.modules and not os.environ.get("SEARCH_TABLEBASE"):
+        return None
+    from search import tablebase
+    return tablebase.known_plan(board)
 
 def find_solution(data, **kwargs):
 
     # Prep data for use
-    bridge_locs=[]
-
-    # Step 1. Use data to form islands.
-    islands,shorelines = form_islands(data)
-
-    # Step 2. Check if the island is isolated or not to find any potential bridges.
-    for curr_group in islands:
+    board=as_board(data)
 
-        if((isol_and_bridges(data, curr_group, bridge_locs))==True):
+    # Step 0. Endgames the open tablebase covers are looked up, not searched.
+    known=tablebase_plan(board)
+    if known is not None:
+        return known_win_pos(board, known, **kwargs)
 
-            #So that the positions in the list of islands corresponds to the list of bridge locs, add empty element
-            bridge_locs.append(" ")
+    # Step 1. Use data to form islands, and the squares that bridge them.
+    graph=form_islands(board)
 
-    # Step 3. Search through bridges to find final winning positions.
-    return finalise_win_pos(data, islands, bridge_locs, shorelines)
-
-class state:
-    def __init__(self,win_pos,islands_left):
-        self.win_pos=win_pos
-        self.islands_states=islands_left
-
-    def sol_found(self):
-        if -1 in self.win_pos:
-            return False
-        else:
-            return True
+    # Step 2. Search through bridges to find final winning positions.
+    return finalise_win_pos(data, board, graph, **kwargs)
 
+#Search nodes are kept by the hundred thousand, so they have slots instead of a
+#__dict__ and are never changed after they are made: a child shares its
+#parent's stacks and only points back at it, and the path is rebuilt from
+#those pointers once a goal is found.
 class node:
-    def __init__(self,tile_data,wh_tiles,parent,in_position):
-        self.tile_data=tile_data
-        self.wh_tiles=wh_tiles
-        self.parent=parent
-        self.in_position=in_position
-
-#Put adjacent bl_tiles into groups called "islands"
-def form_islands(data, **kwargs):
-
-        islands=[]
-        group=[]
-        win_pos=[]
-        island_shore=[]
+    __slots__=("whites","parent","move")
 
-        #Initialise list of black tile locations from data
-        black_tiles=data["black"]
-
-
-        for curr_bl_tile in range(0,len(black_tiles)):
-
-
-            if(len(group)==0):
-                group = [black_tiles[curr_bl_tile]]
-
-            #Step through a 1x1 square around the tile.
-            for i in range(black_tiles[curr_bl_tile][x]-1, black_tiles[curr_bl_tile][x]+2):
-                for j in range(black_tiles[curr_bl_tile][y]-1, black_tiles[curr_bl_tile][y]+2):
-
-                    #Check the coordinate is actually on the board
-                    if(on_board([i,j])):
-
-                        #Can skip checking the tile the piece is on
-                        if(not ((i==black_tiles[curr_bl_tile][x]) and (j==black_tiles[curr_bl_tile][y]))):
-
-                                to_append=True
-
-                                for bl_tile in range(0,len(black_tiles)):
-
-                                    #To stop duplicates, only check bl_tiles that are further on in the list
-                                    if((bl_tile>curr_bl_tile) and (black_tiles[bl_tile][x]==i) and (black_tiles[bl_tile][y]==j)):
+    def __init__(self,whites,parent,move):
+        self.whites=whites
+        self.parent=parent
+        self.move=move
 
-                                        #The tile is adjacent so add it to the group, and swap so that it will be checked next.
-                                        group.append(black_tiles[bl_tile])
-                                        black_tiles=swap(black_tiles,curr_bl_tile+1,bl_tile)
+#A move (n, start, end) packed into one int: n above two 6-bit square numbers
+def pack_move(move):
+    n, start, end = move
+    return n << 12 | start << 6 | end
 
-                                    if([i,j] == [black_tiles[bl_tile][x],black_tiles[bl_tile][y]]):
-                                        to_append=False
+def unpack_move(packed):
+    return packed >> 12, packed >> 6 & 63, packed & 63
 
-                                if([i,j] not in island_shore and to_append):
-                                    island_shore.append([i,j])
+#The boom squares of a tablebase plan, as win_pos (one group per boom)
+def known_win_pos(board, known, every=False, file=None, **kwargs):
 
-            #If the curr_bl_tile is the last in the group list then we know it does not
-            #have anymore adjacent tiles - append to lists and clear the group list
-            if(group[-1] == black_tiles[curr_bl_tile]):
-                islands.append(group)
-                group=[]
-                win_pos.append(island_shore)
-                island_shore=[]
+    paths, booms = known
+    if not booms:
+        print("Unable to find solution. Whoopsies.", file=file)
+        limit=board.white_tokens()
+        return [[-1]*limit] if every else [-1]*limit
+    win_pos=[[list(boom)] for boom in booms]
+    return [win_pos] if every else win_pos
 
-        return islands, win_pos
+#Put adjacent bl_tiles into groups called "islands", and find the bridges between them
+@timed("form_islands")
+def form_islands(board, **kwargs):
 
-# the function 'isolated' should check if there is a bl_tile in the outer side of the 2x2 square and return True or False
-def isol_and_bridges(data, island, bridge_locs, **kwargs):
+    return island_graph(board.black)
 
-    #Initialise list of black tile locations from data
-    black_tiles=data["black"]
-    isol=True
-    isls_bridges=[]
+# Finds winning solution coords, given the island graph. With every=True the result is
+# a list of win_pos, one for each way of placing a minimum set of booms (up to COVER_LIMIT).
+@timed("finalise_win_pos")
+def finalise_win_pos(data, board, graph, every=False, file=None, stats=None, **kwargs):
 
-    #Search in a 2x2 square around each tile that makes up the island
-    for curr_tile in island:
-        for i in range(curr_tile[x]-2,curr_tile[x]+3,1):
-            for j in range(curr_tile[y]-2,curr_tile[y]+3,1):
+    if stats is None:
+        stats=search_stats.search("win_pos")
 
-                #Don't need to check if its in the 1x1 square, this has already been checked
-                if(not ((abs(i-curr_tile[x])<=1) and (abs(j-curr_tile[y])<=1))):
+    #Every boom needs its own white token, and a stack can split to share them out
+    limit=board.white_tokens()
 
-                    #See if a black tile is on this location (that isn't already in the island)
-                    for bl_tile in black_tiles:
-                                if ((bl_tile not in island) and (bl_tile[x]==i) and (bl_tile[y]==j)):
-                                    isol=False
+    covers=min_covers(graph.groups, graph.goal(), limit, graph.isolated, every=every, stats=stats)
 
-                                    #Now to find the bridge locations. There are three cases to check
-                                    #1. if the gap is a straight diagonal, there is only one tile that can be the bridge
-                                    if(abs(curr_tile[x]-bl_tile[x])==2 and abs(curr_tile[y]-bl_tile[y])==2):
-                                        if([(curr_tile[x]+bl_tile[x])/2,(curr_tile[y]+bl_tile[y])/2] not in bridge_locs):
-                                            isls_bridges.append([int((curr_tile[x]+bl_tile[x])/2),int((curr_tile[y]+bl_tile[y])/2)])
-                                    #2. if the gap is straight then there are three tiles that can form the bridge
-                                    elif(curr_tile[x]-bl_tile[x]==0):
-                                        for k in range(curr_tile[x]-1,curr_tile[x]+2):
-                                            if([k,(curr_tile[y]+bl_tile[y])/2] not in bridge_locs):
-                                                isls_bridges.append([k,int((curr_tile[y]+bl_tile[y])/2)])
-                                    elif(curr_tile[y]-bl_tile[y]==0):
-                                       for p in range(curr_tile[y]-1,curr_tile[y]+2):
-                                            if([(curr_tile[x]+bl_tile[x])/2,p] not in bridge_locs):
-                                                isls_bridges.append([int((curr_tile[x]+bl_tile[x])/2),p])
-                                    #3. if the gap is like a knights move in chess, there are two tiles to bridge.
-                                    else:
-                                        if(abs(curr_tile[x]-bl_tile[x])==1):
-                                         if([curr_tile[x],(curr_tile[y]+bl_tile[y])/2] not in bridge_locs):
-                                                isls_bridges.append([curr_tile[x],int((curr_tile[y]+bl_tile[y])/2)])
-                                         if([bl_tile[x],(curr_tile[y]+bl_tile[y])/2] not in bridge_locs):
-                                                isls_bridges.append([bl_tile[x],int((curr_tile[y]+bl_tile[y])/2)])
+    if not covers:
+        print("Unable to find solution. Whoopsies.", file=file)
+        return [[-1]*limit] if every else [-1]*limit
 
-                                        if(abs(curr_tile[y]-bl_tile[y])==1):
-                                         if([curr_tile[y],(curr_tile[x]+bl_tile[x])/2] not in bridge_locs):
-                                                isls_bridges.append([int((curr_tile[x]+bl_tile[x])/2),curr_tile[y]])
-                                         if([bl_tile[y],(curr_tile[y]+bl_tile[y])/2] not in bridge_locs):
-                                                isls_bridges.append([int((curr_tile[x]+bl_tile[x])/2),bl_tile[y]])
+    solutions=[]
+    for cover in covers:
+        for targets in cover_targets(graph.groups, cover):
+            solutions.append([[list(coords(sq)) for sq in target] for target in targets])
+    return solutions[:COVER_LIMIT] if every else solutions[0]
 
-    if(not isol):
-        bridge_locs.append(isls_bridges)
-    return isol
 
-# Finds winning solution coords, given bridge locations and win_pos for islands
-def finalise_win_pos(data, islands, bridge_locs, shorelines, **kwargs):
+#Extra helper functions#
+# Priority queue that also indexes its entries by key, so membership tests are
+# O(1) and a key can be pushed again with a lower priority (decrease-key).
+# Superseded heap entries are blanked out and skipped when popped. Equal priorities
+# pop first in, first out, unless tiebreak maps the push count to another order.
+class open_set:
+    #Slots of a heap entry, [priority, tie, state, key]; state is None once superseded
+    PRIORITY=0
+    TIE=1
+    STATE=2
+    KEY=3
+
+    def __init__(self, tiebreak=None):
+        self.heap=[]
+        self.entries={}
+        self.count=0
+        self.tiebreak=tiebreak
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def push(self, key, object, priority):
+        old=self.entries.get(key)
+        if old is not None:
+            if old[self.PRIORITY] <= priority:
+                return False
+            old[self.STATE]=None
+
+        tie=self.count if self.tiebreak is None else self.tiebreak(self.count)
+        entry=[priority, tie, object, key]
+        self.count+=1
+        self.entries[key]=entry
+        heapq.heappush(self.heap,entry)
+        return True
+
+    def pop(self):
+        while self.heap:
+            entry=heapq.heappop(self.heap)
+            if entry[self.STATE] is not None:
+                del self.entries[entry[self.KEY]]
+                return entry[self.STATE]
+        raise KeyError("pop from an empty open_set")
+
+
+# Raised by move_function when no plan was found but a search gave up at PLAN_LIMIT,
+# so the board may still be solvable with a bigger budget.
+class search_limit(Exception):
+    pass
+
+
+# Size-bounded map from search states to results. The least recently used entry
+# is dropped once TABLE_SIZE entries are held, so big batches stay in bounded memory.
+class transposition_table:
+    def __init__(self, maxsize=None):
+        self.entries=OrderedDict()
+        self.maxsize=TABLE_SIZE if maxsize is None else maxsize
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        if key not in self.entries:
+            return default
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key]=value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+def print_sol(data, paths, booms, file=None, **kwargs):
+
+    #The movements of the white tiles, then the boom statements, all in one write
+    if file is None:
+        file=sys.stdout
+    file.write(serialise(paths, booms))
+    file.flush()
+
+
+@timed("move_function")
+def move_function(data, win_pos, table=None, stats=None, covers=None, fields=None):
+
+    if stats is None:
+        stats=search_stats.search("pathfinding")
+
+    board = as_board(data)
+    whites = white_stacks(board)
+
+    #Small endgames have their shortest plan in the tablebase, if one is open
+    known=tablebase_plan(board)
+    if known is not None:
+        return known
+
+    #Every winning position is a group of squares, any one of which will do
+    options=cover_options(covers or [win_pos])
+
+    #Distance fields by targets, shared by the ordering and the searches (and by
+    #later calls on the same black tokens and white token count, if the caller keeps them)
+    if fields is None:
+        fields={}
+    cap=sum(n for sq, n in whites)
+    for targets in options:
+        if targets not in fields:
+            fields[targets]=distance_fields(board.black, targets, cap)
+
+    #Every minimum set of booms clears the board, so plan each one and keep the shortest.
+    #The most promising go first, so the bound they set cuts the later searches short.
+    if len(options) > 1:
+        options.sort(key=lambda targets: plan_estimate(whites, targets, fields[targets]))
+    best, finished = plan_covers(board, whites, options, fields, table=table, stats=stats)
+
+    #No plan reaches every target, so there is nothing worth moving
+    if best is None:
+        if not finished:
+            raise search_limit("no plan within {} expansions".format(PLAN_LIMIT))
+        return [], []
+    return best
+
+
+# The target masks of each win_pos in covers, one per group of squares.
+def cover_options(covers, **kwargs):
+
+    return [tuple(sum(1 << square(coord[0],coord[1]) for coord in group)
+        for group in option if group != -1) for option in covers]
+
+
+# Plan every cover option (a tuple of target masks) in the order given and return
+# (best, finished): best is the (moves, booms) taking the fewest actions, or None if no
+# option has a plan, and finished is False if the deadline or PLAN_LIMIT cut a search
+# short. Every search is bounded by the best plan so far and by known(), if given: the
+# fewest actions of a plan found elsewhere (None for none), asked before each search.
+# A better plan only becomes the best if accept(moves, booms) agrees. table keeps exact
+# plans across calls on the same board, and stats gets every search's node counts.
+def plan_covers(board, whites, options, fields, weight=1, known=None, deadline=None, tiebreak=None, accept=None, table=None, stats=None, **kwargs):
 
-    #Simplify problem automatically by removing islands that don't have a bridge as an option
-    #Need to fix len of white so that it includes if white has a stack of more than 1
-    win_pos=[-1]*len(data["white"])
-    count=0
-    islands_left=[1]*len(islands)
-
-    for element in range(0,len(bridge_locs)):
-
-        if bridge_locs[element] == " ":
-            win_pos[count]=shorelines[element]
-            count+=1
-            islands_left[element]=0
-
-    #Initialise states
-    prior=0
-    h=[]
-    heapq.heapify(h)
-    count=add_state(h,state(win_pos,islands_left),prior,0)
-
-    expanded_states=0
-
-
-    while (len(h)>0):
-
-        #Pop next element off heap
-        curr_entry=heapq.heappop(h)
-        expanded_states+=1
-
-        #Check if the solution has been found
-        if(curr_entry[STATE].sol_found()):
+    best=None
+    finished=True
+    for targets in options:
+        if deadline is not None and time.perf_counter() > deadline:
+            finished=False
             break
 
-        #Check there are still white tiles to use
-        elif -1 in curr_entry[STATE].win_pos:
-
-            #Check if the program has been running for too long
-            if(expanded_states>=BUDGET):
-                print("Unable to find solution. Whoopsies.")
+        #A plan of m moves and at least one boom only helps if m + 1 beats every plan so far
+        cost=None if known is None else known()
+        if best is not None and (cost is None or len(best[0])+len(best[1]) < cost):
+            cost=len(best[0])+len(best[1])
+        bound=None if cost is None else cost-1
+
+        key=(whites, targets)
+        plan=None if table is None else table.get(key)
+        cut=False
+        if plan is None:
+            counts={}
+            plan=plan_moves(board, whites, targets, stats=counts, weight=weight, bound=bound,
+                deadline=deadline, fields=fields[targets], tiebreak=tiebreak)
+            cut=counts.get("expanded", 0) > PLAN_LIMIT or \
+                deadline is not None and time.perf_counter() > deadline
+            finished=finished and not cut
+            for name, amount in counts.items():
+                if name == "heap_max":
+                    high_water(stats, name, amount)
+                else:
+                    tally(stats, name, amount)
+        if plan is None:
+            continue
+
+        moves, final = plan
+        booms=boom_order(board, final, targets)
+        #Only an exact plan neither the bound nor the limit cut short is this cover's best
+        if table is not None and weight == 1 and not cut and \
+                (bound is None or len(moves)+len(booms) <= bound+1):
+            table.put(key, plan)
+        if (cost is None or len(moves)+len(booms) < cost) and (accept is None or accept(moves, booms)):
+            best=(moves, booms)
+
+    return best, finished
+
+
+# The white stacks as a sorted tuple of (square, height) pairs. Tokens in a stack
+# are interchangeable, so sorting makes every arrangement of the same stacks one state.
+def white_stacks(board, **kwargs):
+
+    return tuple((sq, board.height[sq]) for sq in bits(board.white))
+
+
+def white_mask(whites, **kwargs):
+
+    mask=0
+    for sq, n in whites:
+        mask |= 1 << sq
+    return mask
+
+
+# Fewest moves a single token could need to get from any square onto the target
+# squares, if every move could go the full cap squares.
+# Admissible estimate of the moves left: each move fills at most one target,
+# and the target furthest from every stack needs at least its distance. bands[t][d]
+# masks the squares within d moves of target t for the tallest stack possible, so
+# merging can't beat them.
+def plan_heuristic(whites, targets, bands, **kwargs):
+
+    occupied=0
+    for sq, n in whites:
+        occupied |= 1 << sq
+    unmet=0
+    far=0
+    for band in bands:
+        if not band[0] & occupied:
+            unmet+=1
+            steps=1
+            while steps < len(band) and not band[steps] & occupied:
+                steps+=1
+            if steps == len(band):
+                return float("inf")
+            far=max(far, steps)
+    return max(unmet, far)
+
+
+# Cheapest matching of the unmet targets to white tokens, each token costing its
+# stack's true distance to the target. Not admissible (one move can bring a stack
+# closer to several targets) but a much sharper guide for the weighted passes.
+def plan_estimate(whites, targets, fields, **kwargs):
+
+    occupied=white_mask(whites)
+    unmet=[element for element in range(0,len(targets)) if not targets[element] & occupied]
+    if not unmet:
+        return 0
+
+    #A stack holding a met target has to leave a token behind
+    tokens=[]
+    for sq, n in whites:
+        spare=n
+        for target in targets:
+            if target >> sq & 1:
+                spare=n-1
                 break
-
-            #Otherwise try a different solution
-            else:
-                for element in range(0,len(bridge_locs)):
-
-                    if curr_entry[STATE].islands_states[element]==1:
-                        original_curr_entry=curr_entry
-
-                        for i in range(0,len(bridge_locs[element])):
-                            curr_entry[STATE]=state(original_curr_entry[STATE].win_pos,original_curr_entry[STATE].islands_states)
-                            coord = bridge_locs[element][i]
-                            check_boom(curr_entry[STATE], bridge_locs, coord)
-                            count=add_state(h,curr_entry[STATE],prior,count)
-
-        prior+=1
-
-    return curr_entry[STATE].win_pos
-
-
-def check_boom(curr_state, bridge_locs, coord, **kwargs):
-
-    for element in range(0,len(bridge_locs)):
-        for i in bridge_locs[element]:
-            if i == coord:
-                curr_state.islands_states[element]=0
-
-    for element in range(0,len(curr_state.win_pos)):
-        if curr_state.win_pos[element]==-1:
-            curr_state.win_pos[element]=coord
+        tokens.extend([(sq, n)]*spare)
+    if len(tokens) < len(unmet):
+        return sum(min(fields[element][n][sq] for sq, n in whites) for element in unmet)
+
+    cost=[[fields[element][n][sq] for sq, n in tokens] for element in unmet]
+    return min_cost_matching(cost)[0]
+
+
+# A* over the positions of all white stacks together until every target square
+# group holds a white token. Returns the moves made and the final stacks of the plan
+# with the fewest actions, its booms (see boom_order) counted as well as its moves.
+# A weight above 1 trades plan length for speed (weighted A* on plan_estimate, taking
+# the first plan found), bound drops any plan that can't beat bound moves, and
+# deadline (a time.perf_counter() value) gives up once passed. fields are the targets' distance fields, if already built,
+# and tiebreak orders equally promising states (see open_set).
+def plan_moves(board, whites, targets, limit=None, stats=None, weight=1, bound=None, deadline=None, fields=None, tiebreak=None, **kwargs):
+
+    if limit is None:
+        limit=PLAN_LIMIT
+    if bound is None:
+        bound=float("inf")
+
+    cap=sum(n for sq, n in whites)
+    if fields is None:
+        fields=distance_fields(board.black, targets, cap)
+    bands=[rings(field[cap]) for field in fields]
+
+    table=movements(board.black)
+    frontier=open_set(tiebreak)
+    gscore={whites:0}
+    frontier.push(whites, node(whites, None, None), plan_heuristic(whites, targets, bands))
+    expanded=generated=deduplicated=heap_max=0
+    found=None
+    #The fewest actions of any plan found so far
+    best=float("inf")
+
+    while frontier:
+
+        curr=frontier.pop()
+        h=plan_heuristic(curr.whites, targets, bands)
+
+        #Every plan left takes at least g + h moves and a boom, so none beats the best
+        if gscore[curr.whites] + h + 1 >= best:
             break
 
-#Extra helper functions#
-def swap(list, pos_1, pos_2, **kwargs):
-
-    list[pos_1], list[pos_2] = list[pos_2], list[pos_1]
-    return list
-
-
-def on_board(coords, **kwargs):
-
-    return (coords[0]>=0 and coords[0]<=7 and coords[1]>=0 and coords[1]<=7)
-
-def add_state(h, object, priority, count, **kwargs):
-
-    entry=[priority, count, object]
-    heapq.heappush(h,entry)
-    return count+1
-
-
-def closest_sol(possible_pos, initial_coord, **kwargs):
-    closest_el=0
-    for i in range(1,len(possible_pos)):
-        if(manh_dist(possible_pos[i],initial_coord)<manh_dist(possible_pos[closest_el],initial_coord)):
-            closest_el=i
-    return possible_pos[closest_el]
-
-def manh_dist(a, b):
-
-    return (abs(a[0] - b[0]) + abs(a[1] - b[1]))
-
-def is_on_black(data, coords, **kwargs):
-
-    for bl_tile in data["black"]:
-        if(coords[1:3] == bl_tile[1:3]):
-            return True
-    return False
-    
-def heuristic(x, y):
-
-    return (abs(x[1] - x[0]) + abs(y[1] - y[0]))
-
-def print_sol(data, paths, booms):
-
-    #Print the movements of the white tiles
-    #Check if the length of paths list is larger than 1
-    #FIX
-    if isinstance(paths[0], list):
-        #Print through the path
-        for i in range(0,len(paths),1):
-            if(paths[i][0][0]-paths[i][1][0]==0):
-                print_move(paths[i][0][0],paths[i][1][1],paths[i][1][2],paths[i][0][1],paths[i][0][2])
-            else:
-                print_move(abs(paths[i][0][0]-paths[i][1][0]),paths[i][1][1],paths[i][1][2],paths[i][0][1],paths[i][0][2])
-
-    #Print the boom statements.
-    for curr_wh_tile in range(0,len(data["white"])):
-        #Check if the length of paths list is larger than 1
-        print_boom(booms[curr_wh_tile][1],booms[curr_wh_tile][2])
-
-
-def move_function(data, win_pos):
-
-    coordinates = []
-    white_tile = data["white"]
-    curr=node(0, white_tile, 0,in_position=[-1]*len(white_tile))
-
-    for curr_wh_tile in range(0,len(win_pos)):
-        #Check if there is more than 1 winning position
-        if isinstance(win_pos[curr_wh_tile][0], list):
-            #Choose the closest coordinate to this white tile
-            final=closest_sol(win_pos[curr_wh_tile],curr.wh_tiles[curr_wh_tile][1:3])
-        else:
-            final=win_pos[curr_wh_tile]
-
-        wh_tiles=list(curr.wh_tiles)
-        n=node(tuple(curr.wh_tiles[curr_wh_tile]),wh_tiles,-1,curr.in_position)
-        n.wh_tiles.remove(curr.wh_tiles[curr_wh_tile])
-
-        move_coordinates=[(0,1), (0,-1), (1,0), (-1,0)] 
-
-        coord_set = set()
-        heap =[]
-
-        gscore = {n.tile_data:0}
-        fscore = {n.tile_data:heuristic(n.tile_data[1:3], final)}
-
-        count=add_state(heap,(fscore[n.tile_data], n),0,0)
-
-        while heap:
-
-            curr = heapq.heappop(heap)[2][1]
-
-            if curr.tile_data[1:3] == tuple(final):
-
-                #If stack is greater than 1, remove extra tiles at old location
-                if(curr.tile_data[stack]>1):
-                    #Make new tile have stack-1
-                    curr.wh_tiles.append([curr.tile_data[stack]-1,curr.parent.tile_data[x],curr.parent.tile_data[y]])
-                    #Make current tile have 1
-                    curr.tile_data=[1,list(curr.tile_data)[x],list(curr.tile_data)[y]]
-                    curr.tile_data=tuple(curr.tile_data)
-
-                #Updates that the tile is in position, doesn't need to be checked to move anymore. 
-                #Also updates the list of target locations to not include the already solved location.
-                for el in range(0,len(curr.in_position)):
-                    if curr.in_position[el] == -1 and (curr.tile_data not in curr.in_position):
-                        curr.in_position[el]=curr.tile_data[1:3]
-                        break
-
-                curr.wh_tiles.insert(0,list(curr.tile_data))
-                #print(white_tile)
-
-                finish=curr.tile_data
-                to_fix_wh_tiles=curr.wh_tiles
-                #Travels through tree, recreating path as it goes.
-                temp_list=[]
-                while curr.parent != -1:
-                    temp_list.append([curr.tile_data, curr.parent.tile_data])
-                    curr = curr.parent
-                for i in range(len(temp_list)-1,-1,-1):
-                    coordinates.append(temp_list[i])
-
-                for el in range(0,len(white_tile)):
-                    if(white_tile[el][1:3]==list(curr.tile_data)[1:3]):
-                        white_tile[el]=list(finish)
-
-                curr.wh_tiles=to_fix_wh_tiles
+        #Plans with as many moves can chain away different numbers of booms, so
+        #the search goes on until no plan left can take fewer actions
+        if h == 0:
+            actions=gscore[curr.whites] + len(boom_order(board, curr.whites, targets))
+            if actions < best:
+                best=actions
+                bound=min(bound, best-1)
+                found=(node_moves(curr), curr.whites)
+            if weight != 1:
                 break
 
-            coord_set.add(curr)
-
-            for stack_height in range(1,curr.tile_data[stack]+1):
-                for i, j in move_coordinates:
+        expanded+=1
+        if expanded > limit:
+            break
+        if deadline is not None and expanded % 256 == 0 and time.perf_counter() > deadline:
+            break
 
-                    to_leave_behind=0
-                    #Check if curr_pos is already in a winning position when about to jump - if so then leave behind a tile.
-                    if(stack_height!=1 and curr.tile_data[1:3] in curr.in_position):
-                            to_leave_behind=abs(1-curr.tile_data[stack])
-                            if(([1,list(curr.tile_data)[1],list(curr.tile_data)[2]] not in curr.wh_tiles)):
-                                curr.wh_tiles.insert(0,[1,curr.tile_data[x],curr.tile_data[y]])
+        g=gscore[curr.whites]+1
+        last=None if curr.move is None else unpack_move(curr.move)
+        for move, child in move_successors(board.black, curr.whites, table, last):
+            generated+=1
+            if g < gscore.get(child, float("inf")):
+                gscore[child]=g
+                h=plan_heuristic(child, targets, bands)
+                if g + h < bound:
+                    if weight != 1:
+                        h=plan_estimate(child, targets, fields)
+                    frontier.push(child, node(child, curr, pack_move(move)), g + weight*h)
+            else:
+                deduplicated+=1
+        heap_max=max(heap_max, len(frontier.heap))
 
-                    check_coordinates = curr.tile_data[stack]-to_leave_behind, curr.tile_data[x] + i*stack_height, curr.tile_data[y] + j*stack_height
+    if stats is not None:
+        tally(stats, "expanded", expanded)
+        tally(stats, "generated", generated)
+        tally(stats, "deduplicated", deduplicated)
+        high_water(stats, "heap_max", heap_max)
+    return found
 
-                    #Check the coordinate is on the board and not on a black tile
-                    if(on_board(check_coordinates[1:3]) and (not is_on_black(data, list(check_coordinates)))):
-                        temp_score = gscore[curr.tile_data] + heuristic(curr.tile_data, check_coordinates)
 
-                        if check_coordinates in coord_set and temp_score >= gscore.get(check_coordinates, 0):
-                            continue
+# The moves from the start of the search to n, in the order they are made.
+def node_moves(curr, **kwargs):
 
-                        if temp_score < gscore.get(check_coordinates, 0) or check_coordinates not in [i[1] for i in heap]:
+    moves=[]
+    while curr.parent is not None:
+        n, start, end = unpack_move(curr.move)
+        moves.append((n, coords(start), coords(end)))
+        curr=curr.parent
+    moves.reverse()
+    return moves
 
-                           #Check if the coordinate is on a white tile
-                            for wh_tile in curr.wh_tiles:
-                                if(list(check_coordinates)[1:3] == wh_tile[1:3] and (list(check_coordinates)[1:3] != n.tile_data[1:3])):
-                                    check_coordinates=list(check_coordinates)[0]+list(wh_tile)[0], list(check_coordinates)[1],list(check_coordinates)[2]
-                                    check_coordinates=tuple(check_coordinates)
-                                    curr.wh_tiles.remove(wh_tile)
-                                    break
 
-                            gscore[check_coordinates] = temp_score
-                            fscore[check_coordinates] = temp_score + heuristic(check_coordinates, final)
+# Boom one white token in each target group. A token already caught in an earlier
+# chain went off with it, so its boom is dropped, and so is everything after the win.
+def boom_order(board, whites, targets, **kwargs):
 
-                            new_curr_wh_tiles=list(curr.wh_tiles)
-                            new_node=node(check_coordinates,new_curr_wh_tiles,curr, curr.in_position)
-                            count=add_state(heap,(fscore[check_coordinates], new_node),0,count)
-                
-    return coordinates, curr.wh_tiles
+    occupied=board.black | white_mask(whites)
+    booms=[]
+    for target in targets:
+        if not occupied & board.black:
+            break
+        for sq in bits(target & occupied):
+            booms.append(coords(sq))
+            occupied &= ~chain(occupied, sq)
+            break
+    return booms